@@ -0,0 +1,60 @@
+"""Compares the per-parameter loop and the vectorized path of BaseStrat.calculate_agg_signal_df.
+
+Each run gets a frame shifted by one bar, like a live cycle, and the indicator cache is disabled,
+so both paths compute every rolling window instead of reading the other's results.
+
+Usage: python -m benchmarks.bench_signal_eval [--bars 5000]
+"""
+import numpy as np
+
+import argparse
+import logging
+import tempfile
+import time
+
+from benchmarks.bench_suite import time_runs
+from benchmarks.fake_exchange import FakeExchange
+from quanttrading.config_manager import StratConfig
+from quanttrading.data_fetcher import DataFetcher
+from user_strategies import Strat002
+
+
+def make_params(num_params: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    windows = rng.integers(10, 500, num_params)
+    thresholds = rng.normal(0, 1, num_params).round(2)
+    return [{'window': int(w), 'threshold': float(t)} for w, t in zip(windows, thresholds)]
+
+
+def bench_signal_eval(num_params: int, num_bars: int, folder: str, repeat: int = 5) -> dict[str, float]:
+    exchange = FakeExchange(now=time.time(), num_bars=num_bars + repeat + 10)
+    data_fetcher = DataFetcher(exchange, folder, store_type='columnar', clock=lambda: exchange.now, rate_limit=1_000_000)
+    df = data_fetcher.fetch_historical_prices('BTCUSDT', '1m', limit=num_bars + repeat - 1)
+    
+    results = {}
+    for vectorized in (False, True):
+        config = StratConfig(1, f'bench_{num_params}_{"vectorized" if vectorized else "loop"}', 'bench', 'BTCUSDT', '1m', 'long', 1.0,
+                             make_params(num_params), 'market', 1.0)
+        strat = Strat002(config, data_fetcher, auto_init=False)
+        strat.vectorized = vectorized
+        strat.indicator_cache = None
+        
+        df_runs = iter(df.iloc[i:i + num_bars] for i in range(repeat))
+        results['vectorized' if vectorized else 'loop'] = time_runs(lambda: strat.calculate_agg_signal_df(next(df_runs)), repeat)['min']
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare the loop and vectorized signal paths at 1, 10 and 100 param sets.')
+    parser.add_argument('--bars', type=int, default=5000, help='History length of each run')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{'params':>8} {'loop (ms)':>12} {'vectorized (ms)':>16} {'speedup':>8}")
+        for num_params in (1, 10, 100):
+            results = bench_signal_eval(num_params, args.bars, folder, args.repeat)
+            speedup = results['loop'] / results['vectorized']
+            print(f"{num_params:>8} {results['loop'] * 1000:>12.2f} {results['vectorized'] * 1000:>16.2f} {speedup:>7.1f}x")
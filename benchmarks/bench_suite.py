@@ -0,0 +1,226 @@
+"""Times the per-cycle hot path against the local FakeExchange and compares the results with a stored baseline.
+
+Usage:
+    python -m benchmarks.bench_suite                      # run, write results and compare with the baseline
+    python -m benchmarks.bench_suite --quick              # smaller sizes and fewer repeats
+    python -m benchmarks.bench_suite --save-baseline      # store this run as the new baseline
+    python -m benchmarks.bench_suite --log requests.jsonl # replay a request log recorded by main.py and time its cycles
+"""
+import pandas as pd
+import numpy as np
+
+from datetime import datetime, timezone
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_exchange import FakeExchange
+from quanttrading import ConfigManager, DataFetcher, PositionEngine, StratPool, Trader
+from quanttrading.config_manager import StratConfig
+from quanttrading.position_book import PositionBook
+from quanttrading.replay import replay_request_log
+from user_strategies import Strat002, Strat003
+
+
+BASELINE_PATH = 'benchmarks/baseline.json'
+RESULTS_PATH = 'benchmarks/results.json'
+
+
+def time_runs(func, repeat: int, before=None) -> dict[str, float]:
+    """Runs func `repeat` times, calling `before` untimed ahead of each run, and returns min and median seconds."""
+    times = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times)}
+
+
+def make_signal_df(num_rows: int, end: pd.Timestamp) -> pd.DataFrame:
+    index = pd.date_range(end=end, periods=num_rows, freq='1min', name='timestamp')
+    rng = np.random.default_rng(num_rows)
+    return pd.DataFrame({'close': 60000 + rng.normal(0, 10, num_rows).cumsum(), 'signal': rng.integers(0, 2, num_rows).astype(float)}, index=index)
+
+
+def bench_signal_store(folder: str, sizes: list[int], repeat: int) -> dict[str, dict]:
+    """Appending one bar with to_signal_csv and reading with fetch_signal_from_csv, on tables of growing size."""
+    results = {}
+    for store_type in ('csv', 'columnar'):
+        data_fetcher = DataFetcher(FakeExchange(now=time.time(), num_bars=10), f'{folder}/{store_type}', store_type=store_type)
+        for size in sizes:
+            name = f'bench-{size}'
+            df = make_signal_df(size, pd.Timestamp('2024-01-01'))
+            data_fetcher.to_signal_csv(df, name)
+
+            # Each write revises the last bar and appends a new one, like a live cycle
+            new_bars = iter(make_signal_df(2, df.index[-1] + pd.Timedelta(minutes=i)) for i in range(1, repeat + 1))
+            results[f'to_signal_csv[{store_type},{size}]'] = time_runs(lambda: data_fetcher.to_signal_csv(next(new_bars), name), repeat)
+            results[f'fetch_signal_from_csv[{store_type},{size}]'] = time_runs(lambda: data_fetcher.fetch_signal_from_csv(name), repeat)
+    return results
+
+
+def make_params(num_params: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    return [{'window': int(w), 'threshold': float(t)} for w, t in zip(rng.integers(10, 200, num_params), rng.normal(0, 1, num_params).round(2))]
+
+
+def bench_agg_signal(folder: str, param_counts: list[int], history_lengths: list[int], repeat: int) -> dict[str, dict]:
+    """BaseStrat.calculate_agg_signal_df at varying parameter counts and history lengths."""
+    results = {}
+    exchange = FakeExchange(now=time.time(), num_bars=max(history_lengths) + 10)
+    data_fetcher = DataFetcher(exchange, f'{folder}/agg', store_type='columnar', clock=lambda: exchange.now, rate_limit=1_000_000)
+
+    for num_params in param_counts:
+        config = StratConfig(1, f'bench_{num_params}', 'bench', 'BTCUSDT', '1m', 'long', 1.0, make_params(num_params), 'market', 1.0)
+        strat = Strat002(config, data_fetcher, auto_init=False)
+        for history in history_lengths:
+            df = data_fetcher.fetch_historical_prices('BTCUSDT', '1m', limit=history)
+            # A new bar invalidates the shared indicators, so every run computes them like a live cycle
+            df_runs = iter(df.iloc[i:len(df) - repeat + i + 1] for i in range(repeat))
+            results[f'calculate_agg_signal_df[{num_params} params,{history} bars]'] = time_runs(lambda: strat.calculate_agg_signal_df(next(df_runs)), repeat)
+    return results
+
+
+def build_trader(folder: str, num_strats: int, num_symbols: int, max_workers: int = 8) -> tuple[FakeExchange, Trader]:
+    """Builds the main.py pipeline on a FakeExchange, spreading strategies over symbols and timeframes round robin."""
+    exchange = FakeExchange(now=time.time(), num_bars=2000)
+    # The request budget would add sleeps unrelated to the code under test
+    data_fetcher = DataFetcher(exchange, folder, store_type='columnar', clock=lambda: exchange.now, incremental=True, rate_limit=1_000_000)
+
+    strats = []
+    for i in range(num_strats):
+        symbol = f'SYM{i % num_symbols:02d}USDT'
+        timeframe = ('1m', '5m', '15m')[(i // num_symbols) % 3]
+        strat_cls = (Strat002, Strat003)[i % 2]
+        config = StratConfig(i + 1, f'bench_{i}', 'bench', symbol, timeframe, 'long_short', 0.1, make_params(2, seed=i), 'market', 1.0)
+        strats.append(strat_cls(config, data_fetcher))
+
+    strat_pool = StratPool()
+    strat_pool.add_strategies(strats)
+    position_engine = PositionEngine(exchange, strat_pool, data_fetcher, PositionBook(exchange, clock=lambda: exchange.now))
+    return exchange, Trader(exchange, position_engine, strat_pool, max_workers=max_workers)
+
+
+def bench_cycle(folder: str, layouts: list[tuple[int, int]], repeat: int) -> dict[str, dict]:
+    """PositionEngine.calculate_pos_delta and a full 1m Trader.trade cycle, each on a new bar."""
+    results = {}
+    for num_strats, num_symbols in layouts:
+        exchange, trader = build_trader(f'{folder}/cycle_{num_strats}_{num_symbols}', num_strats, num_symbols)
+        position_engine = trader.position_engine
+        symbols = list(trader.strat_pool.strategies)
+
+        def next_bar():
+            exchange.now += 60
+
+        def pos_deltas():
+            position_engine.refresh_positions(symbols)
+            for symbol in symbols:
+                timeframes = trader.strat_pool.get_timeframes_for_symbol(symbol)
+                position_engine.calculate_pos_delta(symbol, [tf for tf in timeframes if tf == '1m'], [tf for tf in timeframes if tf != '1m'])
+
+        def start_cycle():
+            next_bar()
+            trader.activate_timeframe('1m')
+
+        results[f'calculate_pos_delta[{num_strats} strats,{num_symbols} symbols]'] = time_runs(pos_deltas, repeat, before=next_bar)
+        results[f'trade[{num_strats} strats,{num_symbols} symbols]'] = time_runs(trader.trade, repeat, before=start_cycle)
+    return results
+
+
+def run_suite(quick: bool = False) -> dict:
+    repeat = 3 if quick else 10
+    with tempfile.TemporaryDirectory() as folder:
+        results = {}
+        results.update(bench_signal_store(folder, [1_000, 10_000] if quick else [1_000, 10_000, 100_000], repeat))
+        results.update(bench_agg_signal(folder, [1, 10] if quick else [1, 10, 100], [500, 5_000] if quick else [500, 5_000, 50_000], repeat))
+        results.update(bench_cycle(folder, [(1, 1), (20, 5)] if quick else [(1, 1), (20, 5), (200, 50)], repeat))
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'quick': quick,
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Prints median times against the baseline and returns the names of benchmarks slower beyond the tolerance."""
+    regressions = []
+    print(f"{'benchmark':<58} {'baseline (ms)':>14} {'current (ms)':>13} {'change':>8}")
+    for name, stats in results['results'].items():
+        current = stats['median']
+        base = baseline['results'].get(name, {}).get('median')
+        if base is None:
+            print(f'{name:<58} {"-":>14} {current * 1000:>13.2f} {"new":>8}')
+            continue
+
+        change = current / base - 1
+        flag = ''
+        if change > tolerance:
+            flag = '  slower'
+            regressions.append(name)
+        elif change < -tolerance:
+            flag = '  faster'
+        print(f'{name:<58} {base * 1000:>14.2f} {current * 1000:>13.2f} {change:>+8.1%}{flag}')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the per-cycle hot path and compare with a stored baseline.')
+    parser.add_argument('--quick', action='store_true', help='Smaller sizes and fewer repeats')
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='Write this run to the baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Relative change reported as slower or faster')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 if any benchmark got slower')
+    parser.add_argument('--log', default=None, help='Replay this request log, recorded with record_log=<path> python main.py, instead of the suite')
+    parser.add_argument('--delay-factor', type=float, default=0.0, help='Scale of the recorded latencies in a --log replay')
+    args = parser.parse_args()
+
+    if args.log:
+        with tempfile.TemporaryDirectory() as folder:
+            replay = replay_request_log(args.log, ConfigManager(is_demo=False).load_strategy_config(), folder, delay_factor=args.delay_factor)
+        print(f"{replay['cycles']} cycles, trade min {replay['cycle_min_ms']:.2f} ms, median {replay['cycle_p50_ms']:.2f} ms, "
+              f"{replay['unused_responses']} recorded responses unused")
+        for method, stats in sorted(replay['calls'].items()):
+            print(f"    {method:<28} {stats['count']:>5}  mean {stats['mean'] * 1000:8.1f} ms  max {stats['max'] * 1000:8.1f} ms")
+        sys.exit(0)
+
+    logging.disable(logging.INFO)
+    results = run_suite(args.quick)
+    logging.disable(logging.NOTSET)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Saved baseline to {args.baseline}')
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}, run with --save-baseline to create one')
+        sys.exit(0)
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+
+    if regressions:
+        print(f'{len(regressions)} benchmarks slower than the baseline by more than {args.tolerance:.0%}')
+        if args.fail_on_regression:
+            sys.exit(1)
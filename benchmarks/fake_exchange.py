@@ -0,0 +1,80 @@
+import ccxt
+import numpy as np
+
+from quanttrading.utils.timeframe import timeframe_to_ms
+
+
+class FakeExchange:
+    """Deterministic in-memory stand-in for the ccxt methods used by the bot, for offline benchmarks."""
+    rateLimit = 0
+    
+    def __init__(self, now: float, num_bars: int = 100_000, seed: int = 0) -> None:
+        self.now = now  # Seconds, advanced by the caller
+        self.start_ms = int(now // 60 * 60 - num_bars * 60) * 1000
+        
+        rng = np.random.default_rng(seed)
+        self.closes = 60000 + np.cumsum(rng.normal(0, 10, num_bars + 1))  # One close per 1m bar
+        self.positions = {}
+        self.calls = {}
+    
+    def count(self, method: str) -> None:
+        self.calls[method] = self.calls.get(method, 0) + 1
+    
+    def get_close(self, timestamp_ms: int) -> float:
+        idx = min(max((timestamp_ms - self.start_ms) // 60000, 0), len(self.closes) - 1)
+        return float(self.closes[idx])
+    
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int | None = None, limit: int | None = None, params: dict = {}) -> list:
+        self.count('fetch_ohlcv')
+        tf_ms = timeframe_to_ms(timeframe)
+        now_ms = int(self.now * 1000)
+        last_open = now_ms // tf_ms * tf_ms
+        limit = min(limit or 200, 1000)
+        
+        first_open = last_open - (limit - 1) * tf_ms if since is None else -(-since // tf_ms) * tf_ms
+        bars = []
+        for open_ms in range(first_open, last_open + 1, tf_ms):
+            close = self.get_close(min(open_ms + tf_ms, now_ms) - 60000)
+            bars.append([open_ms, close, close, close, close, 1.0])
+            if len(bars) == limit:
+                break
+        return bars
+    
+    def fetch_funding_rate_history(self, symbol: str, since: int | None = None, limit: int | None = None, params: dict = {}) -> list:
+        self.count('fetch_funding_rate_history')
+        step = 8 * 3600 * 1000
+        last = int(self.now * 1000) // step * step
+        limit = min(limit or 200, 200)
+        
+        first = last - (limit - 1) * step if since is None else -(-since // step) * step
+        return [{'timestamp': ts, 'fundingRate': ((ts // step) % 7 - 3) * 1e-4} for ts in range(first, last + 1, step)][:limit]
+    
+    def fetch_position(self, symbol: str, params: dict = {}) -> dict:
+        self.count('fetch_position')
+        contracts = self.positions.get(symbol, 0.0)
+        side = 'long' if contracts > 0 else 'short' if contracts < 0 else None
+        return {'symbol': symbol, 'side': side, 'contracts': abs(contracts)}
+    
+    def fetch_positions(self, symbols: list[str] | None = None, params: dict = {}) -> list[dict]:
+        self.count('fetch_positions')
+        if symbols is not None and len(symbols) > 1:
+            raise ccxt.ArgumentsRequired('bybit fetchPositions() does not accept an array with more than one symbol')
+        positions = []
+        for symbol in symbols or list(self.positions):
+            contracts = self.positions.get(symbol, 0.0)
+            side = 'long' if contracts > 0 else 'short' if contracts < 0 else None
+            positions.append({'symbol': symbol, 'side': side, 'contracts': abs(contracts)})
+        return positions
+    
+    def market(self, symbol: str) -> dict:
+        return {'symbol': symbol, 'precision': {'amount': 0.001}}
+    
+    def fetch_order_book(self, symbol: str, limit: int | None = None, params: dict = {}) -> dict:
+        self.count('fetch_order_book')
+        close = self.get_close(int(self.now * 1000) - 60000)
+        return {'bids': [[close - 0.5, 1.0]], 'asks': [[close + 0.5, 1.0]]}
+    
+    def create_order(self, symbol: str, type: str, side: str, amount: float, price: float | None = None, params: dict = {}) -> dict:
+        self.count('create_order')
+        self.positions[symbol] = self.positions.get(symbol, 0.0) + (amount if side == 'buy' else -amount)
+        return {'id': str(sum(self.calls.values())), 'symbol': symbol, 'side': side, 'amount': amount, 'filled': amount, 'status': 'closed'}
@@ -2,43 +2,58 @@ import pandas as pd
 import numpy as np
 from apscheduler.schedulers.blocking import BlockingScheduler
 
+import os
+
 from quanttrading.exchange import init_exchange
-from quanttrading import PositionEngine, Trader, DataFetcher, ConfigManager, StratPool, TradeScheduler
-from user_strategies import (
-    Strat001,
-    Strat002,
-    Strat003,
-)
+from quanttrading.utils.rate_limit import RateLimiter, RateLimitedExchange
+from quanttrading.utils.recorder import RecordingExchange
+from quanttrading import ConfigManager
+from quanttrading.config_watcher import ConfigWatcher
+from quanttrading.pipeline import Pipeline
+from quanttrading.utils.metrics import metrics
+from quanttrading.utils.telegram import TelegramNotifier, TelegramTransport
 
 FOLDER = 'user_data_test'
+METRICS_PORT = 9100
+CONFIG_WATCH_SECONDS = 10
+RECORD_LOG = os.getenv('record_log')  # Request log path, e.g. record_log=user_data_test/requests.jsonl.gz python main.py
+
+metrics.enable()
+metrics.start_http_server(METRICS_PORT)
 
+# The recorder wraps the exchange inside the rate limiter, so recorded latencies exclude limiter waits
 exchange = init_exchange(is_demo=True)
+recorder = RecordingExchange(exchange, RECORD_LOG) if RECORD_LOG else None
+exchange = RateLimitedExchange(recorder or exchange, RateLimiter(max_calls=20, period=1.0))
 
 config_man = ConfigManager(is_demo=False)
 strat_configs = config_man.load_strategy_config()
 
-data_fetcher = DataFetcher(exchange, FOLDER)
-
-
-strats =[
-    Strat001(strat_configs[0], data_fetcher),
-    Strat002(strat_configs[1], data_fetcher),
-    Strat003(strat_configs[2], data_fetcher),
-]
-
-strat_pool = StratPool()
-strat_pool.add_strategies(strats)
-
-pos_engine = PositionEngine(exchange, strat_pool, data_fetcher)
-
-trader = Trader(exchange, pos_engine, strat_pool)
+tg_transport = TelegramTransport()
+notifier = TelegramNotifier(tg_transport) if tg_transport.enabled else None
 
 scheduler = BlockingScheduler()
 
-trade_scheduler = TradeScheduler(scheduler, trader, strat_pool)
-trade_scheduler.add_jobs()
-
-scheduler.add_job(trader.trade, 'cron', second='0', args=[0.5], id='trade')
+# Symbol caps and side clipping are set in quanttrading/pipeline.py, shared with replays
+pipeline = Pipeline(exchange, strat_configs, FOLDER, scheduler, notifier=notifier, restore_snapshot=True)
+data_fetcher = pipeline.data_fetcher
+if recorder is not None:
+    recorder.clock = pipeline.clock  # Recorded times follow the exchange clock, which a replay feeds to its pipeline
 
+trade_scheduler = pipeline.trade_scheduler
+trade_scheduler.sync_clock_offset(exchange)
+trade_scheduler.add_jobs()
 
-scheduler.start()
\ No newline at end of file
+config_watcher = ConfigWatcher(config_man, pipeline.strat_pool, trade_scheduler, pipeline.create_strategy)
+scheduler.add_job(config_watcher.check, 'interval', seconds=CONFIG_WATCH_SECONDS, id='config_watch')
+scheduler.add_job(data_fetcher.save_snapshot, 'interval', minutes=5, id='snapshot')
+scheduler.add_job(metrics.log_summary, 'interval', minutes=5, id='metrics_summary')
+
+try:
+    scheduler.start()
+finally:
+    data_fetcher.save_snapshot()
+    if notifier is not None:
+        notifier.close()
+    if recorder is not None:
+        recorder.close()
\ No newline at end of file
@@ -0,0 +1,108 @@
+import pandas as pd
+import numpy as np
+
+from quanttrading.config_manager import SIDE_BOUNDS, StratConfig
+from quanttrading.data_fetcher import DataFetcher
+from quanttrading.signal_store import ColumnarSignalStore
+from quanttrading.strategies import BaseStrat
+from quanttrading.utils.log import init_logger
+from quanttrading.utils.timeframe import TIMEFRAME_SECONDS
+
+
+logger = init_logger('backtest')
+
+def load_local_data(symbol: str, timeframe: str, folder: str = 'user_data') -> pd.DataFrame:
+    """Reads klines (or funding rates with timeframe='funding') persisted by DataFetcher in {folder}/klines."""
+    store = ColumnarSignalStore(f'{folder}/klines')
+    return store.read(DataFetcher.get_kline_store_name(symbol, timeframe))
+
+
+class Backtester:
+    """Backtests a strategy class on historical data through the same signal code as live trading.
+
+    Positions follow the live PositionEngine: target = signal * max_pos contracts, restricted to the
+    configured side and held from the bar after the signal. Costs are charged in basis points of the
+    traded notional. Everything is computed on whole columns, without a per-bar loop.
+    """
+    def __init__(self, strat_cls: type[BaseStrat], config: StratConfig, cost_bps: float = 5.0) -> None:
+        self.config = config
+        self.cost_bps = cost_bps
+        self.strat = strat_cls(config, data_fetcher=None, auto_init=False)
+
+    def run(self, df: pd.DataFrame, prices: pd.Series | None = None) -> pd.DataFrame:
+        """Returns per-bar signal, position, pnl, cost, cum_pnl and drawdown.
+
+        df is the strategy's alpha frame (klines or funding rates). prices defaults to df['close'];
+        pass the kline closes explicitly for strategies whose alpha has no price, e.g. funding rates.
+        """
+        signal = self.strat.calculate_signals(df)['signal']
+        if prices is None:
+            prices = df['close']
+        if not signal.index.equals(prices.index):
+            # A signal stays in force until the next alpha bar
+            signal = signal.reindex(prices.index.union(signal.index)).ffill().reindex(prices.index)
+
+        lower, upper = SIDE_BOUNDS[self.config.side]
+        target_pos = np.clip(signal.fillna(0).to_numpy(dtype=np.float64), lower, upper) * self.config.max_pos
+        close = prices.to_numpy(dtype=np.float64)
+
+        # Position decided on a bar's close is held over the next bar
+        position = np.concatenate([[0.0], target_pos[:-1]])
+        price_diff = np.concatenate([[0.0], np.diff(close)])
+        traded = np.abs(np.diff(position, prepend=0.0))
+        cost = traded * close * self.cost_bps / 1e4
+        pnl = position * price_diff - cost
+
+        cum_pnl = np.cumsum(pnl)
+        drawdown = cum_pnl - np.maximum.accumulate(np.maximum(cum_pnl, 0.0))
+
+        return pd.DataFrame({
+            'close': close,
+            'signal': signal.to_numpy(),
+            'position': position,
+            'traded': traded,
+            'cost': cost,
+            'pnl': pnl,
+            'cum_pnl': cum_pnl,
+            'drawdown': drawdown,
+        }, index=prices.index)
+
+    def get_stats(self, result: pd.DataFrame, timeframe: str | None = None) -> dict[str, float]:
+        """Summarizes a run, or any slice of one: total pnl, max drawdown, turnover in contracts and notional, annualized Sharpe."""
+        timeframe = timeframe or self.config.timeframe
+        bars_per_year = 365 * 24 * 3600 / TIMEFRAME_SECONDS[timeframe]
+        pnl = result['pnl'].to_numpy()
+        pnl_std = pnl.std() if len(pnl) else 0.0
+
+        # Drawdown is recomputed from the pnl so that it only covers the given slice
+        cum_pnl = np.cumsum(pnl)
+        drawdown = cum_pnl - np.maximum.accumulate(np.maximum(cum_pnl, 0.0))
+
+        return {
+            'total_pnl': float(cum_pnl[-1]) if len(pnl) else 0.0,
+            'max_drawdown': float(drawdown.min()) if len(pnl) else 0.0,
+            'total_cost': float(result['cost'].sum()),
+            'turnover': float(result['traded'].sum()),
+            'notional_turnover': float((result['traded'] * result['close']).sum()),
+            'num_trades': int((result['traded'] > 0).sum()),
+            'sharpe': float(pnl.mean() / pnl_std * np.sqrt(bars_per_year)) if pnl_std > 0 else 0.0,
+        }
+
+    def run_local(self, folder: str = 'user_data', price_timeframe: str | None = None, alpha_timeframe: str | None = None) -> tuple[pd.DataFrame, dict[str, float]]:
+        """Runs on the data stored locally for the configured symbol.
+
+        alpha_timeframe selects the alpha table, e.g. 'funding' for funding rate strategies; by default
+        the strategy runs on the price klines.
+        """
+        price_timeframe = price_timeframe or self.config.timeframe
+        prices = load_local_data(self.config.symbol, price_timeframe, folder)['close']
+
+        if alpha_timeframe is None or alpha_timeframe == price_timeframe:
+            df = prices.to_frame()
+        else:
+            df = load_local_data(self.config.symbol, alpha_timeframe, folder)
+
+        result = self.run(df, prices)
+        stats = self.get_stats(result, price_timeframe)
+        logger.info(f'{self.config.id:03d} {self.config.symbol} {self.config.timeframe} backtest over {len(result)} bars: {stats}')
+        return result, stats
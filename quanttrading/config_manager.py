@@ -8,6 +8,13 @@ from quanttrading.utils.log import init_logger
 
 logger = init_logger('config')
 
+# Signal bounds (lower, upper) of each strategy side, None for unbounded
+SIDE_BOUNDS = {
+    'long': (0, None),
+    'short': (None, 0),
+    'long_short': (None, None),
+}
+
 @dataclass
 class StratConfig:
     id: int
@@ -20,6 +27,7 @@ class StratConfig:
     params: list[dict[str, float | int]]
     order_type: str
     mdd_limit: float
+    strat_class: str | None = None  # 'class' in the yaml, required there, see quanttrading.strat_registry
 
 
 class ConfigManager:
@@ -62,11 +70,17 @@ class ConfigManager:
             'params',
             'order_type',
             'mdd_limit',
+            'class',
         ]
         valid_timeframes = ['1m', '3m', '5m', '15m', '30m', '1h', '4h', '8h', '1d']
-        valid_sides = ['long', 'short', 'long_short']
+        valid_sides = list(SIDE_BOUNDS)
         valid_order_types = ['market', 'limit']
         
+        strat_ids = [strategy.get('id') for strategy in self.config.get('strategies', [])]
+        duplicate_ids = sorted({strat_id for strat_id in strat_ids if strat_ids.count(strat_id) > 1})
+        if duplicate_ids:
+            raise ValueError(f"Duplicate strategy ids: {duplicate_ids}")
+        
         for strategy in self.config.get('strategies', []):
             for field in required_fields:
                 if field not in strategy:
@@ -81,6 +95,9 @@ class ConfigManager:
             if strategy['order_type'] not in valid_order_types:
                 raise ValueError(f"Invalid order_type in strategy {strategy['id']}: {strategy['order_type']}")
             
+            if not isinstance(strategy['class'], str) or not strategy['class']:
+                raise ValueError(f"Invalid class in strategy {strategy['id']}: {strategy['class']}")
+            
             params = strategy.get('params', []) 
             for param in params:
                 for key, value in param.items():
@@ -129,5 +146,6 @@ class ConfigManager:
             max_pos=strategy['max_pos'],
             params=strategy['params'],
             order_type=strategy['order_type'],
-            mdd_limit=strategy['mdd_limit']
+            mdd_limit=strategy['mdd_limit'],
+            strat_class=strategy.get('class'),
         )
@@ -0,0 +1,95 @@
+from typing import Callable
+import os
+import time
+
+from quanttrading.config_manager import ConfigManager, StratConfig
+from quanttrading.strat_pool import StratPool
+from quanttrading.strategies import BaseStrat
+from quanttrading.trade_scheduler import TradeScheduler
+from quanttrading.utils.log import init_logger
+
+
+logger = init_logger('watcher')
+
+class ConfigWatcher:
+    """Reloads the strategy config when its file changes and applies the difference to the live pool.
+
+    Strategies are matched by id. Added and changed configs get a new strategy from `strat_factory`
+    (created with auto_init=False), warmed up from the shared kline cache. Added strategies are warmed
+    up outside the cycle lock; changed ones write the same signal files as the strategy they replace,
+    so they are created under the lock, together with the pool swap, between cycles. Unchanged
+    strategies keep their state. An invalid file is logged and the running config is kept.
+    """
+    def __init__(self, config_manager: ConfigManager, strat_pool: StratPool, trade_scheduler: TradeScheduler,
+                 strat_factory: Callable[[StratConfig], BaseStrat]) -> None:
+        self.config_manager = config_manager
+        self.strat_pool = strat_pool
+        self.trade_scheduler = trade_scheduler
+        self.strat_factory = strat_factory
+        self.file_stat = self.get_file_stat()
+
+    def get_file_stat(self) -> tuple[float, int] | None:
+        try:
+            stat = os.stat(self.config_manager.config_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self) -> bool:
+        """Reloads the config if the file changed since the last check. Returns True if the pool was updated."""
+        file_stat = self.get_file_stat()
+        if file_stat == self.file_stat:
+            return False
+        self.file_stat = file_stat
+
+        try:
+            configs = self.config_manager.load_strategy_config()
+        except (FileNotFoundError, ValueError) as e:
+            logger.error(f'Keeping the running config, reload failed: {e}')
+            return False
+        return self.apply(configs)
+
+    def apply(self, configs: list[StratConfig]) -> bool:
+        """Adds, removes and replaces strategies so the pool matches the configs."""
+        start = time.perf_counter()
+        current = {strat.id: strat for strat in self.strat_pool.get_strategies()}
+        new_configs = {config.id: config for config in configs}
+
+        removed = [strat for strat_id, strat in current.items() if strat_id not in new_configs]
+        changed = [config for strat_id, config in new_configs.items() if strat_id in current and current[strat_id].config != config]
+        added = [config for strat_id, config in new_configs.items() if strat_id not in current]
+        if not (removed or changed or added):
+            logger.info('Config file changed, strategies unchanged')
+            return False
+
+        added_strats = self.create_strategies(added)
+        if added_strats is None:
+            return False
+
+        with self.trade_scheduler.cycle_lock:
+            changed_strats = self.create_strategies(changed)
+            if changed_strats is None:
+                return False
+
+            for strat in removed:
+                self.strat_pool.remove_strategy(strat)
+            for config in changed:
+                self.strat_pool.remove_strategy(current[config.id])
+            self.strat_pool.add_strategies(changed_strats + added_strats)
+            self.trade_scheduler.update_timeframes()
+
+        logger.info(f'Reloaded config in {(time.perf_counter() - start) * 1000:.1f} ms, '
+                    f'added {[config.id for config in added]}, changed {[config.id for config in changed]}, '
+                    f'removed {[strat.id for strat in removed]}')
+        return True
+
+    def create_strategies(self, configs: list[StratConfig]) -> list[BaseStrat] | None:
+        """Creates and warms up a strategy per config. Returns None if any of them fails."""
+        try:
+            strats = [self.strat_factory(config) for config in configs]
+            for strat in strats:
+                strat.init_data()
+        except Exception as e:
+            logger.error(f'Keeping the running config, failed to create strategies: {e}')
+            return None
+        return strats
@@ -1,34 +1,255 @@
 import ccxt
 import pandas as pd
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 
+from quanttrading.indicators import IndicatorCache
+from quanttrading.kline_cache import KlineCache, merge_frames, to_ms
+from quanttrading.signal_store import init_signal_store
 from quanttrading.utils.log import init_logger
+from quanttrading.utils.metrics import metrics
+from quanttrading.utils.rate_limit import RateLimiter, RateLimitedExchange
+from quanttrading.utils.timeframe import TIMEFRAME_SECONDS, get_bar_open, timeframe_to_ms, resample_klines
 
 
 logger = init_logger('data')
 
 class DataFetcher:
-    def __init__(self, exchange: ccxt.Exchange, folder: str = 'user_data') -> None:
+    def __init__(
+        self,
+        exchange: ccxt.Exchange,
+        folder: str = 'user_data',
+        store_type: str = 'csv',
+        clock: Callable[[], float] = time.time,
+        incremental: bool = False,
+        page_limit: int = 1000,
+        rate_limit: int = 10,
+        resample: bool = False,
+        validate_resample: bool = False,
+    ) -> None:
         self.exchange = exchange
         self.user_data_folder = folder
+        self.clock = clock
         
         self.csv_folder = f'{folder}/data'
         os.makedirs(self.csv_folder, exist_ok=True)
+        
+        self.signal_store = init_signal_store(store_type, self.csv_folder)
+        self.latest_signals = {}  # {strat_name: latest aggregated signal}
+        
+        self.kline_store = init_signal_store('columnar', f'{folder}/klines')
+        self.store_locks = {}  # {kline store name: lock}, serializing backfills and snapshots of the same name
+        self.store_locks_lock = threading.Lock()
+        self.page_limit = page_limit  # Max klines per exchange request
+        # Request budget per second; a RateLimitedExchange already draws every request from the bot's shared budget
+        self.rate_limiter = None if isinstance(exchange, RateLimitedExchange) else RateLimiter(rate_limit, 1.0)
+        
+        self.incremental = incremental
+        self.kline_cache = KlineCache(self.fetch_historical_prices, clock, incremental)
+        self.funding_rates = {}  # {symbol: funding rate buffer}, used in incremental mode
+        self.indicator_cache = IndicatorCache()  # Indicators shared by all strategies within a bar
+        
+        self.resample = resample  # Derive higher timeframes from the finest registered one per symbol
+        self.validate_resample = validate_resample  # Compare every resampled frame against exchange bars
+    
+    def register_window(self, symbol: str, timeframe: str, window: int) -> None:
+        """Registers the history a strategy needs so shared fetches cover every strategy on the symbol."""
+        self.kline_cache.register(symbol, timeframe, window)
+        
+        if self.resample:
+            # Size each base feed for every higher timeframe derived from it
+            for (sym, tf), tf_window in list(self.kline_cache.windows.items()):
+                base_tf = self.get_base_timeframe(sym, tf)
+                if sym == symbol and base_tf != tf:
+                    ratio = TIMEFRAME_SECONDS[tf] // TIMEFRAME_SECONDS[base_tf]
+                    self.kline_cache.register(symbol, base_tf, (tf_window + 1) * ratio)
+    
+    def fetch_cached_prices(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+        """Fetches the last `limit` klines through the shared cache, one exchange call per symbol, timeframe and bar."""
+        base_tf = self.get_base_timeframe(symbol, timeframe) if self.resample else timeframe
+        if base_tf == timeframe:
+            return self.kline_cache.get(symbol, timeframe, limit)
+        
+        # One extra higher bar so a partially covered first bucket can be dropped
+        ratio = TIMEFRAME_SECONDS[timeframe] // TIMEFRAME_SECONDS[base_tf]
+        base_df = self.kline_cache.get(symbol, base_tf, (limit + 1) * ratio)
+        df = resample_klines(base_df, timeframe).iloc[-limit:]
+        
+        if self.validate_resample:
+            self.validate_resampled_prices(symbol, timeframe, df)
+        
+        return df
+    
+    def get_base_timeframe(self, symbol: str, timeframe: str) -> str:
+        """Returns the finest registered timeframe on the symbol that evenly divides the given timeframe."""
+        candidates = [
+            tf for (sym, tf) in list(self.kline_cache.windows)
+            if sym == symbol and TIMEFRAME_SECONDS[timeframe] % TIMEFRAME_SECONDS[tf] == 0
+        ]
+        return min(candidates, key=lambda tf: TIMEFRAME_SECONDS[tf], default=timeframe)
+    
+    def validate_resampled_prices(self, symbol: str, timeframe: str, resampled_df: pd.DataFrame, tolerance: float = 1e-9) -> pd.DataFrame:
+        """Compares locally resampled bars against the exchange's own bars and logs any mismatch."""
+        exchange_df = self.fetch_historical_prices(symbol, timeframe, limit=len(resampled_df))
+        
+        compare_df = resampled_df[['close']].join(exchange_df[['close']], how='outer', lsuffix='_local', rsuffix='_exchange')
+        compare_df['diff'] = (compare_df['close_local'] - compare_df['close_exchange']).abs()
+        mismatches = compare_df[~(compare_df['diff'] <= tolerance * compare_df['close_exchange'].abs())]
+        
+        if mismatches.empty:
+            logger.debug('%s %s resampled %d bars match the exchange', symbol, timeframe, len(compare_df))
+        else:
+            logger.warning(f'{symbol} {timeframe} {len(mismatches)}/{len(compare_df)} resampled bars differ from the exchange, first at {mismatches.index[0]}')
+        
+        return compare_df
+    
+    def fetch_cached_funding_rates(self, symbol: str, limit: int) -> pd.DataFrame:
+        """Fetches the last `limit` funding rates, only asking for rates since the last buffered one in incremental mode."""
+        buffer = self.funding_rates.get(symbol)
+        
+        if not self.incremental or buffer is None or len(buffer) < limit:
+            df = self.fetch_funding_rate_history(symbol, limit=limit)
+        else:
+            new_df = self.fetch_funding_rate_history(symbol, since=to_ms(buffer.index[-1]))
+            df = merge_frames(buffer, new_df, limit)
+        
+        self.funding_rates[symbol] = df
+        return df.iloc[-limit:].copy()
+    
+    def log_cache_stats(self, reset: bool = True) -> None:
+        stats = self.kline_cache.get_stats()
+        logger.info(f"Kline cache hits: {stats['hits']}, misses: {stats['misses']}, hit rate: {stats['hit_rate']:.0%}, bars fetched: {stats['bars_fetched']}")
+        
+        stats = self.indicator_cache.get_stats()
+        logger.info(f"Indicator cache hits: {stats['hits']}, misses: {stats['misses']}, hit rate: {stats['hit_rate']:.0%}")
+        
+        if reset:
+            self.kline_cache.reset_stats()
+            self.indicator_cache.reset_stats()
     
     def fetch_historical_prices(self, symbol: str, timeframe: str, since: int | None = None, limit: int | None = None) -> pd.DataFrame:
+        if limit is not None and limit > self.page_limit:
+            # Windows longer than one page go through the paginated, persisted backfill
+            tf_ms = timeframe_to_ms(timeframe)
+            if since is None:
+                since = get_bar_open(self.clock() * 1000, timeframe) - (limit - 1) * tf_ms
+            
+            return self.backfill_prices(symbol, timeframe, since, since + (limit - 1) * tf_ms).iloc[-limit:]
+        
+        if self.rate_limiter is not None:
+            with metrics.span('rate_limit_wait'):
+                self.rate_limiter.acquire()
         try:
-            logger.debug(f'Fetching historical klines for {symbol} {timeframe} since {since} with limit {limit}')
-            data = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since , limit=limit)
+            logger.debug('Fetching historical klines for %s %s since %s with limit %s', symbol, timeframe, since, limit)
+            with metrics.span('fetch_ohlcv'):
+                data = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since , limit=limit)
         except Exception as e:
             logger.error(f'Error fetching ohlcv data: {e}')
             raise e
         
         return self.process_ohlcv_data(data)
     
+    def fetch_prices_paginated(self, symbol: str, timeframe: str, since: int, until: int, max_workers: int = 4) -> pd.DataFrame:
+        """Splits [since, until] into page-sized requests, fetches them concurrently and stitches the result."""
+        tf_ms = timeframe_to_ms(timeframe)
+        since = get_bar_open(since, timeframe)
+        page_starts = range(since, until + 1, self.page_limit * tf_ms)
+        
+        def fetch_page(page_since: int) -> pd.DataFrame:
+            limit = min(self.page_limit, (until - page_since) // tf_ms + 1)
+            return self.fetch_historical_prices(symbol, timeframe, since=page_since, limit=limit)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages = list(executor.map(fetch_page, page_starts))
+        
+        df = pd.concat(pages)
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        df = df[df.index <= pd.to_datetime(until, unit='ms')]
+        
+        logger.info(f'Fetched {len(df)} klines for {symbol} {timeframe} in {len(pages)} pages')
+        return df
+    
+    def backfill_prices(self, symbol: str, timeframe: str, since: int, until: int | None = None, max_workers: int = 4) -> pd.DataFrame:
+        """Returns klines in [since, until], fetching only the ranges missing from the local kline store."""
+        tf_ms = timeframe_to_ms(timeframe)
+        if until is None:
+            until = get_bar_open(self.clock() * 1000, timeframe)
+        
+        name = self.get_kline_store_name(symbol, timeframe)
+        
+        with self.get_store_lock(name):
+            # Only the first and last stored timestamps are read to find the missing ranges
+            if not self.kline_store.exists(name) or self.kline_store.get_num_rows(name) == 0:
+                self.kline_store.write(self.fetch_prices_paginated(symbol, timeframe, since, until, max_workers), name)
+            else:
+                first = self.kline_store.read_first_timestamp(name) // 10**6
+                last = self.kline_store.read_last_timestamp(name) // 10**6
+                if until >= last:
+                    # Start at the last stored bar so an unfinished bar gets revised
+                    self.kline_store.write(self.fetch_prices_paginated(symbol, timeframe, last, until, max_workers), name)
+                if since < first:
+                    self.kline_store.prepend(self.fetch_prices_paginated(symbol, timeframe, since, first - tf_ms, max_workers), name)
+            
+            if not self.kline_store.exists(name):
+                return pd.DataFrame()
+            return self.kline_store.read_range(name, since * 10**6, until * 10**6)
+    
+    @staticmethod
+    def get_kline_store_name(symbol: str, timeframe: str) -> str:
+        return f"{symbol.replace('/', '_').replace(':', '_')}-{timeframe}"
+    
+    def get_store_lock(self, name: str) -> threading.Lock:
+        with self.store_locks_lock:
+            if name not in self.store_locks:
+                self.store_locks[name] = threading.Lock()
+            return self.store_locks[name]
+    
+    def write_kline_store(self, df: pd.DataFrame, name: str) -> None:
+        with self.get_store_lock(name):
+            self.kline_store.write(df, name)
+    
+    def save_snapshot(self) -> None:
+        """Persists the buffered klines and funding rates to the kline store so a restart can resume from them."""
+        for (symbol, timeframe), (_, _, df) in list(self.kline_cache.entries.items()):
+            self.write_kline_store(df, self.get_kline_store_name(symbol, timeframe))
+        
+        for symbol, df in list(self.funding_rates.items()):
+            self.write_kline_store(df, self.get_kline_store_name(symbol, 'funding'))
+        
+        logger.info(f'Saved snapshot of {len(self.kline_cache.entries)} kline and {len(self.funding_rates)} funding rate buffers')
+    
+    def restore_snapshot(self) -> None:
+        """Seeds the buffers of every registered window from the kline store, so incremental mode only fetches missed bars."""
+        restored = 0
+        # Copied, as strategies created by a config reload may register windows meanwhile
+        windows = list(self.kline_cache.windows.items())
+        for (symbol, timeframe), window in windows:
+            name = self.get_kline_store_name(symbol, timeframe)
+            if self.kline_store.exists(name):
+                df = self.kline_store.read(name).iloc[-window:]
+                # bar_open of -1 forces a refresh on first use, which fetches only bars since the snapshot
+                self.kline_cache.entries[(symbol, timeframe)] = (-1, window, df)
+                restored += 1
+        
+        for symbol in {symbol for (symbol, _), _ in windows}:
+            name = self.get_kline_store_name(symbol, 'funding')
+            if self.kline_store.exists(name):
+                self.funding_rates[symbol] = self.kline_store.read(name)
+                restored += 1
+        
+        logger.info(f'Restored {restored} buffers from snapshot')
+    
     def fetch_funding_rate_history(self, symbol: str, since: int | None = None, limit: int | None = None) -> pd.DataFrame:
+        if self.rate_limiter is not None:
+            with metrics.span('rate_limit_wait'):
+                self.rate_limiter.acquire()
         try:
-            logger.debug(f'Fetching funding rate history for {symbol} since {since} with limit {limit}')
-            funding_rates = self.exchange.fetch_funding_rate_history(symbol=symbol, since=since, limit=limit)
+            logger.debug('Fetching funding rate history for %s since %s with limit %s', symbol, since, limit)
+            with metrics.span('fetch_funding_rate'):
+                funding_rates = self.exchange.fetch_funding_rate_history(symbol=symbol, since=since, limit=limit)
             
         except Exception as e:
             logger.error(f'Error fetching funding rate history: {e}')
@@ -43,12 +264,11 @@ class DataFetcher:
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
         df.set_index('timestamp', inplace=True)
         
-        logger.debug(f'Processed {len(df)} rows of data')
+        logger.debug('Processed %d rows of data', len(df))
         return df
     
     def process_funding_rate_history(self, funding_rates: list[dict]) -> pd.DataFrame:
-        df = pd.DataFrame(funding_rates)
-        df = df[['timestamp', 'fundingRate']]
+        df = pd.DataFrame(funding_rates, columns=['timestamp', 'fundingRate'])
         
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
         df.set_index('timestamp', inplace=True)
@@ -57,36 +277,33 @@ class DataFetcher:
         return df
     
     def to_signal_csv(self, df: pd.DataFrame, strat_name: str) -> None:
-        file_path = f'{self.csv_folder}/{strat_name}.csv'
-        
-        if df is None or df.empty:
-            logger.info(f'No data to save for {strat_name} strategy')
-            df =pd.DataFrame()
-        
-        if not os.path.exists(file_path):
-            df.to_csv(file_path)
-            logger.info(f'Saved {len(df)} rows for {strat_name} strategy')
-        else:
-            old_df = pd.read_csv(file_path, index_col=0, parse_dates=True)
-            combined_df = pd.concat([old_df, df])
-            combined_df = combined_df[~combined_df.index.duplicated(keep='last')]
-            
-            combined_df.to_csv(file_path)
-            appended_rows = len(combined_df) - len(old_df)
-            
-            if appended_rows == 0:
-                logger.debug(f'Updated latest data for {strat_name} strategy')
-            else:
-                logger.debug(f'Appended {appended_rows} rows of data for {strat_name} strategy')
+        self.signal_store.write(df, strat_name)
     
     def fetch_signal_from_csv(self, strat_name: str) -> float:
-        file_path = f'{self.csv_folder}/{strat_name}.csv'
-        
-        if not os.path.exists(file_path):
+        if not self.signal_store.exists(strat_name):
             logger.info(f'No csv for {strat_name} strategy')
             raise FileNotFoundError(f'No csv for {strat_name} strategy')
         else:
-            df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+            df = self.signal_store.read(strat_name)
             signal = df['signal'].iloc[-1]
             # logger.info(f'Fetched {signal} signal for {strat_name} strategy')
-            return signal
\ No newline at end of file
+            return signal
+    
+    def update_latest_signal(self, strat_name: str, signal: float) -> None:
+        self.latest_signals[strat_name] = signal
+    
+    def fetch_latest_signal(self, strat_name: str) -> float:
+        """Returns the latest signal from memory, falling back to a tail read of the store on cold start."""
+        if strat_name in self.latest_signals:
+            return self.latest_signals[strat_name]
+        
+        if not self.signal_store.exists(strat_name):
+            logger.info(f'No csv for {strat_name} strategy')
+            raise FileNotFoundError(f'No csv for {strat_name} strategy')
+        
+        with metrics.span('signal_store_read'):
+            signal = self.signal_store.read_last(strat_name)['signal']
+        logger.debug('Loaded %s signal for %s strategy from store', signal, strat_name)
+        
+        self.latest_signals[strat_name] = signal
+        return signal
\ No newline at end of file
@@ -0,0 +1,320 @@
+import pandas as pd
+import numpy as np
+
+import math
+import threading
+
+
+def shift_rows(values: np.ndarray, num: int) -> np.ndarray:
+    """values[i - num] at row i, with the first row repeated before the start."""
+    if num == 0:
+        return values
+    return np.concatenate([np.full(num, values[0]), values[:-num]]) if num < len(values) else np.full(len(values), values[0])
+
+
+def rolling_moment_sums(values: np.ndarray, windows: np.ndarray, squares: bool = True, block_size: int = 4096) -> tuple[np.ndarray, ...]:
+    """Rolling sums of values (and squared values) for several windows at once, shape (len(values), len(windows)).
+
+    Cumulative sums restart every `block_size` rows and each block is centered on its first finite value,
+    so rounding error stays bounded by one block instead of growing with the series. With block_size >=
+    window a window spans at most two blocks; its older part is shifted to the newer block's offset.
+    Returns (sums, squared sums or None, offset of each row's block); the sums are of values minus that
+    offset. Windows that are not full or contain a NaN are NaN, like pandas' rolling().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    windows = np.asarray(windows, dtype=np.int64)
+    num_rows = len(values)
+    sums = np.full((num_rows, len(windows)), np.nan)
+    sq_sums = sums.copy() if squares else None
+    if num_rows == 0 or len(windows) == 0:
+        return sums, sq_sums, np.zeros(num_rows)
+
+    block_size = max(block_size, int(windows.max()))
+    blocks = np.full(-(-num_rows // block_size) * block_size, np.nan)
+    blocks[:num_rows] = values
+    blocks = blocks.reshape(-1, block_size)
+
+    is_finite = np.isfinite(blocks)
+    first_finite = blocks[np.arange(len(blocks)), is_finite.argmax(axis=1)]
+    offsets = np.where(is_finite.any(axis=1), first_finite, 0.0)
+    centered = np.where(is_finite, blocks - offsets[:, None], 0.0)
+
+    def prefix_sums(block_values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        cum_sum = np.cumsum(block_values, axis=1)  # Inclusive prefix within each block
+        return cum_sum.ravel()[:num_rows], (cum_sum - block_values).ravel()[:num_rows], cum_sum[:, -1]
+
+    moments = [prefix_sums(centered)] + ([prefix_sums(centered ** 2)] if squares else [])
+    has_nan = not is_finite.ravel()[:num_rows].all()
+    nan_counts = prefix_sums((~is_finite).astype(np.float64)) if has_nan else None
+
+    row_offsets = np.repeat(offsets, block_size)[:num_rows]
+
+    for col, window in enumerate(windows.tolist()):
+        # Rows whose window starts in the previous block: the first window - 1 rows of every block but the first
+        rows = (np.arange(block_size, num_rows, block_size)[:, None] + np.arange(window - 1)[None, :]).ravel()
+        rows = rows[rows < num_rows]
+        starts = rows - window + 1
+        older_blocks = rows // block_size - 1
+        shift = offsets[older_blocks] - offsets[older_blocks + 1]
+        num_older = (older_blocks + 1) * block_size - starts
+
+        def window_sums(prefix: tuple) -> tuple[np.ndarray, np.ndarray]:
+            """Window sums of every row, and the sums over the older part of the windows spanning two blocks."""
+            cum_sum, exclusive, block_totals = prefix
+            result = cum_sum - shift_rows(exclusive, window - 1)
+            older = block_totals[older_blocks] - exclusive[starts]
+            result[rows] = cum_sum[rows] + older
+            return result, older
+
+        col_sums, sum_older = window_sums(moments[0])
+        col_sums[rows] += num_older * shift
+        invalid = np.arange(num_rows) < window - 1
+        if has_nan:
+            invalid |= window_sums(nan_counts)[0] > 0
+        col_sums[invalid] = np.nan
+        sums[:, col] = col_sums
+
+        if squares:
+            col_sq_sums, _ = window_sums(moments[1])
+            col_sq_sums[rows] += 2 * shift * sum_older + num_older * shift ** 2
+            col_sq_sums[invalid] = np.nan
+            sq_sums[:, col] = col_sq_sums
+
+    return sums, sq_sums, row_offsets
+
+
+def rolling_mean_matrix(values: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """Rolling means for several windows at once, computed once per distinct window."""
+    unique_windows, inverse = np.unique(np.asarray(windows, dtype=np.int64), return_inverse=True)
+    sums, _, offsets = rolling_moment_sums(values, unique_windows, squares=False)
+    means = sums / unique_windows + offsets[:, None]
+    return means[:, inverse]
+
+
+def rolling_std_matrix(values: np.ndarray, windows: np.ndarray, ddof: int = 1) -> np.ndarray:
+    """Rolling sample standard deviations for several windows at once, matching pandas' rolling().std()."""
+    unique_windows, inverse = np.unique(np.asarray(windows, dtype=np.int64), return_inverse=True)
+    sums, sq_sums, _ = rolling_moment_sums(values, unique_windows)
+
+    # Windows of at most ddof values have no sample deviation, NaN like pandas
+    var = (sq_sums - sums ** 2 / unique_windows) / np.where(unique_windows > ddof, unique_windows - ddof, np.nan)
+    stds = np.sqrt(np.clip(var, 0, None))
+    return stds[:, inverse]
+
+
+class RollingStats:
+    """Rolling mean and sample variance over a fixed-size ring buffer, updated in O(1) per value.
+
+    Uses Welford's update for adding, sliding and replacing values. The running sums are
+    recomputed from the buffer every `resync_every` updates to bound floating point drift.
+    While the window holds a NaN the stats are NaN, like pandas' rolling(); the running sums
+    are not updated and are recomputed once the last NaN leaves the window.
+    """
+    def __init__(self, window: int, resync_every: int = 10_000) -> None:
+        self.window = int(window)
+        self.resync_every = resync_every
+        self.buffer = np.zeros(self.window)
+        self.pos = 0  # Next write position in the ring
+        self.count = 0
+        self.mean_ = 0.0
+        self.m2 = 0.0
+        self.num_updates = 0
+        self.nan_count = 0  # NaNs in the buffer
+        self.stale = False  # Running sums skipped an update and must be recomputed
+
+    def update(self, value: float) -> None:
+        """Adds a new value, evicting the oldest one once the window is full."""
+        value = float(value)
+        old = self.buffer[self.pos] if self.count == self.window else None
+        if old is None:
+            self.count += 1
+
+        if not self.skip_nan(old, value):
+            if old is None:
+                delta = value - self.mean_
+                self.mean_ += delta / self.count
+                self.m2 += delta * (value - self.mean_)
+            else:
+                self.slide(old, value)
+
+        self.buffer[self.pos] = value
+        self.pos = (self.pos + 1) % self.window
+        self.after_update()
+
+    def replace_last(self, value: float) -> None:
+        """Replaces the most recent value, e.g. when the last bar's close is revised."""
+        if self.count == 0:
+            return self.update(value)
+
+        last_pos = (self.pos - 1) % self.window
+        value = float(value)
+        old = self.buffer[last_pos]
+        if not self.skip_nan(old, value):
+            if self.count == 1:
+                self.mean_, self.m2 = value, 0.0
+            else:
+                self.slide(old, value, self.count)
+
+        self.buffer[last_pos] = value
+        self.after_update()
+
+    def skip_nan(self, old: float | None, new: float) -> bool:
+        """Counts the NaNs entering and leaving the buffer; returns True if the running sums cannot take this update."""
+        had_nan = self.nan_count > 0
+        self.nan_count += math.isnan(new) - (old is not None and math.isnan(old))
+        skip = had_nan or self.nan_count > 0
+        self.stale |= skip
+        return skip
+
+    def slide(self, old: float, new: float, n: int | None = None) -> None:
+        n = n or self.window
+        old_mean = self.mean_
+        self.mean_ += (new - old) / n
+        self.m2 += (new - old) * (new - self.mean_ + old - old_mean)
+
+    def after_update(self) -> None:
+        self.num_updates += 1
+        if self.nan_count == 0 and (self.stale or self.num_updates % self.resync_every == 0):
+            values = self.buffer[:self.count] if self.count < self.window else self.buffer
+            self.mean_ = values.mean()
+            self.m2 = ((values - self.mean_) ** 2).sum()
+            self.stale = False
+
+    @property
+    def mean(self) -> float:
+        return self.mean_ if self.count == self.window and self.nan_count == 0 else np.nan
+
+    @property
+    def var(self) -> float:
+        if self.count < self.window or self.window < 2 or self.nan_count > 0:
+            return np.nan
+        return max(self.m2, 0.0) / (self.window - 1)
+
+    @property
+    def std(self) -> float:
+        return np.sqrt(self.var)
+
+
+class StreamingRollingStats:
+    """Keeps the rolling mean/std columns of a bar series up to date by feeding only unseen bars.
+
+    Bars after the last seen timestamp are added, a repeated last timestamp revises the last value,
+    and earlier rows reuse the values computed on previous calls.
+    """
+    def __init__(self, window: int) -> None:
+        self.window = int(window)
+        self.stats = RollingStats(self.window)
+        self.last_ts = None
+        self.mean = pd.Series(dtype=np.float64)
+        self.std = pd.Series(dtype=np.float64)
+
+    def update(self, values: pd.Series) -> tuple[pd.Series, pd.Series]:
+        index = values.index
+        if self.last_ts is None or index[0] > self.last_ts:
+            # Cold start, or a gap since the last call: reseed from the whole frame
+            self.stats = RollingStats(self.window)
+            self.last_ts = None
+            start = 0
+        else:
+            start = int(index.searchsorted(self.last_ts, side='left'))
+
+        closes = values.to_numpy(dtype=np.float64)
+        new_mean = np.empty(len(values) - start)
+        new_std = np.empty(len(values) - start)
+        for i in range(start, len(values)):
+            if index[i] == self.last_ts:
+                self.stats.replace_last(closes[i])
+            else:
+                self.stats.update(closes[i])
+            new_mean[i - start] = self.stats.mean
+            new_std[i - start] = self.stats.std
+        self.last_ts = index[-1]
+
+        mean = self.mean.reindex(index)
+        std = self.std.reindex(index)
+        mean.iloc[start:] = new_mean
+        std.iloc[start:] = new_std
+
+        self.mean, self.std = mean, std
+        return mean, std
+
+
+class IndicatorCache:
+    """Indicator arrays shared across strategies, keyed by (symbol, timeframe, indicator, window).
+
+    Entries of a (symbol, timeframe) are dropped as soon as a series with a different last bar
+    (timestamp or value) is seen, so a cached value never outlives the bar it was computed on.
+    A cached array serves any request whose bars are a contiguous part of the cached ones. Indicators
+    only look back `window` bars, so a request starting later than the cached array gets the warm-up
+    NaNs it would have computed itself. Cached arrays are read-only; partial hits return copies.
+    """
+    def __init__(self) -> None:
+        self.entries = {}  # {(symbol, timeframe, indicator, window): (int64 timestamps, values)}
+        self.bar_stamps = {}  # {(symbol, timeframe): (last timestamp, last value)}
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def check_bar(self, symbol: str, timeframe: str, timestamps: np.ndarray, values: pd.Series) -> None:
+        stamp = (timestamps[-1], values.iat[-1])
+        if self.bar_stamps.get((symbol, timeframe)) != stamp:
+            self.bar_stamps[(symbol, timeframe)] = stamp
+            self.entries = {key: entry for key, entry in self.entries.items() if key[:2] != (symbol, timeframe)}
+
+    def lookup(self, symbol: str, timeframe: str, indicator: str, windows: list[int], values: pd.Series) -> dict[int, np.ndarray]:
+        """Returns the cached arrays aligned to `values` for every window that is cached."""
+        timestamps = values.index.asi8
+        found = {}
+
+        with self.lock:
+            self.check_bar(symbol, timeframe, timestamps, values)
+
+            for window in windows:
+                entry = self.entries.get((symbol, timeframe, indicator, window))
+                if entry is not None:
+                    entry_ts, entry_values = entry
+                    start = int(np.searchsorted(entry_ts, timestamps[0]))
+                    end = start + len(timestamps)
+                    if end <= len(entry_ts) and entry_ts[start] == timestamps[0] and entry_ts[end - 1] == timestamps[-1]:
+                        if start == 0 and end == len(entry_ts):
+                            found[window] = entry_values
+                        else:
+                            # Rows whose window reaches before the requested bars were computed with history the caller did not pass
+                            values_slice = entry_values[start:end].copy()
+                            if start > 0:
+                                values_slice[:window - 1] = np.nan
+                            found[window] = values_slice
+                        continue
+                self.misses += 1
+
+            self.hits += len(found)
+        return found
+
+    def store(self, symbol: str, timeframe: str, indicator: str, window: int, values: pd.Series, result: np.ndarray) -> np.ndarray:
+        """Caches a read-only copy of the result and returns it."""
+        result = np.array(result, dtype=np.float64)
+        result.flags.writeable = False
+        with self.lock:
+            self.entries[(symbol, timeframe, indicator, window)] = (values.index.asi8, result)
+        return result
+
+    def get(self, symbol: str, timeframe: str, indicator: str, window: int, values: pd.Series, compute) -> np.ndarray:
+        """Returns the cached array, or calls compute() and caches its result."""
+        found = self.lookup(symbol, timeframe, indicator, [window], values)
+        if window in found:
+            return found[window]
+
+        return self.store(symbol, timeframe, indicator, window, values, compute())
+
+    def get_stats(self) -> dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,143 @@
+import pandas as pd
+import numpy as np
+
+from typing import Callable
+import threading
+import time
+
+from quanttrading.utils.timeframe import get_bar_open, timeframe_to_ms
+from quanttrading.utils.log import init_logger
+
+
+logger = init_logger('cache')
+
+def merge_frames(buffer: pd.DataFrame, new_df: pd.DataFrame, capacity: int) -> pd.DataFrame:
+    """Merges new rows into a buffer, letting new rows overwrite revised ones, and keeps the last `capacity` rows."""
+    if buffer is None or buffer.empty:
+        return new_df.iloc[-capacity:]
+    if new_df is None or new_df.empty:
+        return buffer.iloc[-capacity:]
+    
+    df = pd.concat([buffer, new_df])
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df.iloc[-capacity:]
+
+def to_ms(timestamp: pd.Timestamp) -> int:
+    return timestamp.value // 10**6
+
+
+class KlineCache:
+    """Shares one OHLCV fetch per (symbol, timeframe) and bar across all strategies.
+
+    Each key holds the longest window registered for it. Concurrent requests for the same key
+    wait on a per-key lock, so only the first one reaches the exchange. In incremental mode the
+    cached frame doubles as a rolling buffer and only bars since the last stored one are fetched.
+    """
+    def __init__(
+        self,
+        fetch_func: Callable[[str, str, int | None, int | None], pd.DataFrame],
+        clock: Callable[[], float] = time.time,
+        incremental: bool = False,
+    ) -> None:
+        self.fetch_func = fetch_func  # fetch_func(symbol, timeframe, since, limit)
+        self.clock = clock
+        self.incremental = incremental
+        
+        self.windows = {}  # {(symbol, timeframe): max window}
+        self.entries = {}  # {(symbol, timeframe): (bar_open, limit, df)}
+        self.locks = {}
+        self.locks_lock = threading.Lock()
+        
+        self.stats = {}  # {(symbol, timeframe): [hits, misses, bars fetched]}, only updated under the key's lock
+    
+    def register(self, symbol: str, timeframe: str, window: int) -> None:
+        key = (symbol, timeframe)
+        self.windows[key] = max(self.windows.get(key, 0), int(window))
+    
+    def get_lock(self, key: tuple[str, str]) -> threading.Lock:
+        with self.locks_lock:
+            if key not in self.locks:
+                self.locks[key] = threading.Lock()
+                self.stats[key] = [0, 0, 0]
+            return self.locks[key]
+    
+    def get(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+        """Returns the last `limit` bars, fetching only on the first request of a bar."""
+        key = (symbol, timeframe)
+        
+        with self.get_lock(key):
+            bar_open = get_bar_open(self.clock() * 1000, timeframe)
+            entry = self.entries.get(key)
+            
+            if entry is not None and entry[0] == bar_open and entry[1] >= limit:
+                self.stats[key][0] += 1
+                df = entry[2]
+            else:
+                self.stats[key][1] += 1
+                fetch_limit = max(limit, self.windows.get(key, 0))
+                df = self.refresh(symbol, timeframe, bar_open, fetch_limit, entry)
+                self.entries[key] = (bar_open, fetch_limit, df)
+        
+        return df.iloc[-limit:].copy()
+    
+    def fetch(self, symbol: str, timeframe: str, since: int | None, limit: int) -> pd.DataFrame:
+        df = self.fetch_func(symbol, timeframe, since, limit)
+        self.stats[(symbol, timeframe)][2] += len(df)
+        return df
+    
+    def refresh(self, symbol: str, timeframe: str, bar_open: int, fetch_limit: int, entry: tuple | None) -> pd.DataFrame:
+        """Fetches the full window, or in incremental mode only the bars since the last buffered one."""
+        if not self.incremental or entry is None or entry[1] < fetch_limit or entry[2].empty:
+            return self.fetch(symbol, timeframe, None, fetch_limit)
+        
+        buffer = entry[2]
+        last_ts = to_ms(buffer.index[-1])
+        num_new = (bar_open - last_ts) // timeframe_to_ms(timeframe) + 1
+        
+        # Too far behind to be worth merging, refetch the whole window instead
+        if num_new >= fetch_limit:
+            return self.fetch(symbol, timeframe, None, fetch_limit)
+        
+        # Start at the last buffered bar so a revised close overwrites it
+        new_df = self.fetch(symbol, timeframe, last_ts, num_new)
+        df = merge_frames(buffer, new_df, fetch_limit)
+        
+        return self.backfill_gaps(symbol, timeframe, df, fetch_limit)
+    
+    def backfill_gaps(self, symbol: str, timeframe: str, df: pd.DataFrame, capacity: int) -> pd.DataFrame:
+        """Detects missing bars inside the buffer and fetches them."""
+        tf_ms = timeframe_to_ms(timeframe)
+        timestamps = df.index.as_unit('ms').asi8
+        gaps = np.flatnonzero(np.diff(timestamps) > tf_ms)
+        
+        if len(gaps) == 0:
+            return df
+        
+        fills = []
+        for i in gaps:
+            gap_start = int(timestamps[i]) + tf_ms
+            num_missing = (int(timestamps[i + 1]) - gap_start) // tf_ms
+            logger.warning(f'{symbol} {timeframe} missing {num_missing} bars from {pd.to_datetime(gap_start, unit="ms")}, backfilling')
+            fills.append(self.fetch(symbol, timeframe, gap_start, num_missing))
+        
+        return merge_frames(df, pd.concat(fills), capacity)
+    
+    def get_stats(self) -> dict[str, float]:
+        with self.locks_lock:
+            key_stats = list(self.stats.values())
+        hits = sum(stats[0] for stats in key_stats)
+        misses = sum(stats[1] for stats in key_stats)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+            'bars_fetched': sum(stats[2] for stats in key_stats),
+        }
+    
+    def reset_stats(self) -> None:
+        with self.locks_lock:
+            keys = list(self.locks)
+        for key in keys:
+            with self.get_lock(key):
+                self.stats[key] = [0, 0, 0]
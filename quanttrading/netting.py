@@ -0,0 +1,84 @@
+import numpy as np
+
+from quanttrading.config_manager import SIDE_BOUNDS
+from quanttrading.data_fetcher import DataFetcher
+from quanttrading.strat_pool import StratPool
+from quanttrading.strategies import BaseStrat
+from quanttrading.utils.log import init_logger
+
+
+logger = init_logger('netting')
+
+class PortfolioNetting:
+    """Nets the signals of all strategies into per-symbol targets with one matrix-vector product.
+
+    Keeps a strategies x symbols allocation matrix holding each strategy's max_pos in its symbol's
+    column, and a signal vector updated as strategies generate signals. The symbol targets are clipped
+    to `symbol_caps` (absolute contracts, unlimited if absent), and with enforce_side=True the signals
+    to each strategy's side, as PositionEngine does without netting. The arrays are rebuilt by sync()
+    whenever the strategy pool changes.
+    """
+    def __init__(self, strat_pool: StratPool, data_fetcher: DataFetcher, symbol_caps: dict[str, float] | None = None,
+                 enforce_side: bool = False) -> None:
+        self.strat_pool = strat_pool
+        self.data_fetcher = data_fetcher
+        self.symbol_caps = symbol_caps or {}
+        self.enforce_side = enforce_side
+        self.pool_version = None
+        self.strats = {}  # {strategy id: strategy}
+        self.strat_idx = {}  # {strategy id: row}
+        self.signals = np.zeros(0)
+        self.targets = {}  # {symbol: target position} of the last update_targets()
+
+    def sync(self) -> None:
+        """Rebuilds the matrix if strategies were added or removed, keeping the signals of unchanged strategies."""
+        if self.pool_version == self.strat_pool.version:
+            return
+
+        strats = self.strat_pool.get_strategies()
+        self.symbols = list(self.strat_pool.symbol_timeframes)
+        symbol_idx = {symbol: j for j, symbol in enumerate(self.symbols)}
+        old_strats, old_signals, old_strat_idx = self.strats, self.signals, self.strat_idx
+
+        self.strats = {strat.id: strat for strat in strats}
+        self.strat_idx = {strat.id: i for i, strat in enumerate(strats)}
+        self.allocation = np.zeros((len(strats), len(self.symbols)))
+        self.signals = np.zeros(len(strats))
+        self.lower = np.full(len(strats), -np.inf)
+        self.upper = np.full(len(strats), np.inf)
+        for i, strat in enumerate(strats):
+            self.allocation[i, symbol_idx[strat.symbol]] = strat.max_pos
+            if self.enforce_side:
+                lower, upper = SIDE_BOUNDS[strat.side]
+                self.lower[i] = -np.inf if lower is None else lower
+                self.upper[i] = np.inf if upper is None else upper
+
+            if old_strats.get(strat.id) is strat:
+                self.signals[i] = old_signals[old_strat_idx[strat.id]]
+            else:
+                self.signals[i] = self.load_signal(strat)
+
+        self.caps = np.array([self.symbol_caps.get(symbol, np.inf) for symbol in self.symbols])
+        self.pool_version = self.strat_pool.version
+        logger.info(f'Built {len(strats)} x {len(self.symbols)} allocation matrix')
+
+    def load_signal(self, strat: BaseStrat) -> float:
+        try:
+            return self.data_fetcher.fetch_latest_signal(strat.strat_name)
+        except FileNotFoundError:
+            logger.warning(f'{strat.id:03d} {strat.symbol} {strat.timeframe}, no stored signal, netting it as 0')
+            return 0.0
+
+    def set_signal(self, strat: BaseStrat, signal: float) -> None:
+        self.signals[self.strat_idx[strat.id]] = signal
+
+    def update_targets(self) -> dict[str, float]:
+        """Computes every symbol's target position from the current signals."""
+        signals = np.clip(self.signals, self.lower, self.upper)
+        targets = np.clip(signals @ self.allocation, -self.caps, self.caps)
+        self.targets = dict(zip(self.symbols, targets.tolist()))
+        logger.debug('Netted targets: %s', self.targets)
+        return self.targets
+
+    def get_target(self, symbol: str) -> float:
+        return self.targets.get(symbol, 0.0)
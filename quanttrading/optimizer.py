@@ -0,0 +1,249 @@
+import pandas as pd
+import numpy as np
+import yaml
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from multiprocessing import shared_memory
+import argparse
+import itertools
+import os
+import time
+
+from quanttrading.backtest import Backtester, load_local_data
+from quanttrading.config_manager import ConfigManager, StratConfig
+from quanttrading.indicators import IndicatorCache
+from quanttrading.strat_registry import get_strat_class, resolve_strat_class
+from quanttrading.strategies import BaseStrat
+from quanttrading.utils.log import init_logger
+
+
+logger = init_logger('optimizer')
+
+# Per-process state of the sweep workers, set once by init_worker
+worker_state = {}
+
+def expand_grid(grid: dict[str, list]) -> list[dict]:
+    """Returns every combination of the grid values, e.g. {'window': [10, 20], 'threshold': [1]} -> 2 param dicts."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def walk_forward_splits(num_bars: int, num_splits: int, train_frac: float = 0.7, anchored: bool = False) -> list[tuple[slice, slice]]:
+    """Splits bars into consecutive (train, test) windows; the test windows tile the end of the data.
+
+    Each fold spans an equal share of the bars, train_frac of it for training. With anchored=True
+    every train window starts at the first bar instead of rolling forward.
+    """
+    fold_size = num_bars // num_splits
+    train_size = int(fold_size * train_frac)
+
+    splits = []
+    for i in range(num_splits):
+        start = i * fold_size
+        test_start = start + train_size
+        test_end = num_bars if i == num_splits - 1 else start + fold_size
+        splits.append((slice(0 if anchored else start, test_start), slice(test_start, test_end)))
+    return splits
+
+
+class SharedFrame:
+    """A DataFrame of float64 columns and a datetime index copied once into shared memory.
+
+    Worker processes attach to it by name, so the price data is never pickled per task.
+    """
+    def __init__(self, df: pd.DataFrame) -> None:
+        arrays = {'__index__': pd.DatetimeIndex(df.index).as_unit('ns').asi8}
+        arrays.update({col: df[col].to_numpy(dtype=np.float64) for col in df.columns})
+
+        self.blocks = []
+        self.spec = []  # [(column, block name, dtype)], picklable description for the workers
+        self.num_rows = len(df)
+        for col, values in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            self.blocks.append(block)
+            self.spec.append((col, block.name, values.dtype.str))
+
+    @staticmethod
+    def attach(spec: list[tuple], num_rows: int) -> tuple[pd.DataFrame, list[shared_memory.SharedMemory]]:
+        """Returns a DataFrame backed by the shared blocks, and the blocks which must be kept alive with it."""
+        blocks, data, index = [], {}, None
+        for col, name, dtype in spec:
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            values = np.ndarray((num_rows,), dtype=np.dtype(dtype), buffer=block.buf)
+            if col == '__index__':
+                index = pd.DatetimeIndex(values.view('datetime64[ns]'), name='timestamp')
+            else:
+                data[col] = values
+
+        return pd.DataFrame(data, index=index, copy=False), blocks
+
+    def close(self) -> None:
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def init_worker(strat_cls: type[BaseStrat], config: StratConfig, alpha_spec: tuple, price_spec: tuple,
+                splits: list[tuple[slice, slice]], cost_bps: float, stats_timeframe: str) -> None:
+    alpha_df, alpha_blocks = SharedFrame.attach(*alpha_spec)
+    price_df, price_blocks = SharedFrame.attach(*price_spec)
+
+    worker_state.update({
+        'strat_cls': strat_cls,
+        'config': config,
+        'alpha_df': alpha_df,
+        'prices': price_df['close'],
+        'blocks': alpha_blocks + price_blocks,
+        'splits': splits,
+        'cost_bps': cost_bps,
+        'stats_timeframe': stats_timeframe,
+    })
+
+
+def evaluate_params(param_sets: list[dict]) -> list[dict]:
+    """Backtests each param set once over the full history and scores it on every train and test window."""
+    state = worker_state
+    rows = []
+    window, indicator_cache = None, None
+    for params in param_sets:
+        # Indicators depend on the window only, so thresholds sharing a window reuse them; param sets come sorted
+        # by window and the cache is replaced when it changes, so a worker holds one window's indicators at a time
+        if indicator_cache is None or params.get('window') != window:
+            window, indicator_cache = params.get('window'), IndicatorCache()
+        backtester = Backtester(state['strat_cls'], replace(state['config'], params=[params]), state['cost_bps'])
+        backtester.strat.indicator_cache = indicator_cache
+        result = backtester.run(state['alpha_df'], state['prices'])
+
+        # Indicators only look back, so slices of a single run equal separate runs once warmed up
+        for split_idx, (train, test) in enumerate(state['splits']):
+            row = {**params, 'split': split_idx}
+            for prefix, bars in (('train', train), ('test', test)):
+                stats = backtester.get_stats(result.iloc[bars], state['stats_timeframe'])
+                row.update({f'{prefix}_{key}': value for key, value in stats.items()})
+            rows.append(row)
+    return rows
+
+
+def run_sweep(strat_cls: type[BaseStrat], config: StratConfig, df: pd.DataFrame, grid: dict[str, list],
+              prices: pd.Series | None = None, num_splits: int = 1, train_frac: float = 0.7, anchored: bool = False,
+              cost_bps: float = 5.0, stats_timeframe: str | None = None, max_workers: int | None = None,
+              chunks_per_worker: int = 4) -> pd.DataFrame:
+    """Evaluates every combination of the grid in parallel and returns one row per (param set, split).
+
+    Price and alpha arrays are placed in shared memory once and attached by each worker process.
+    """
+    if prices is None:
+        prices = df['close']
+    param_sets = expand_grid(grid)
+    splits = walk_forward_splits(len(prices), num_splits, train_frac, anchored)
+    max_workers = max_workers or os.cpu_count()
+
+    # Param sets sharing a window are kept in the same chunk so their indicators are computed once
+    param_sets.sort(key=lambda params: params.get('window', 0))
+    num_chunks = max(1, min(len(param_sets), max_workers * chunks_per_worker))
+    chunks = [list(chunk) for chunk in np.array_split(np.array(param_sets, dtype=object), num_chunks)]
+
+    start = time.perf_counter()
+    alpha_frame = SharedFrame(df)
+    price_frame = SharedFrame(prices.rename('close').to_frame())
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=init_worker,
+            initargs=(strat_cls, config, (alpha_frame.spec, alpha_frame.num_rows), (price_frame.spec, price_frame.num_rows),
+                      splits, cost_bps, stats_timeframe or config.timeframe),
+        ) as executor:
+            rows = [row for chunk_rows in executor.map(evaluate_params, chunks) for row in chunk_rows]
+    finally:
+        alpha_frame.close()
+        price_frame.close()
+
+    logger.info(f'Evaluated {len(param_sets)} param sets x {num_splits} splits on {len(prices)} bars '
+                f'with {max_workers} workers in {time.perf_counter() - start:.2f}s')
+    return pd.DataFrame(rows)
+
+
+def select_top_params(results: pd.DataFrame, grid_keys: list[str], metric: str = 'sharpe', top_n: int = 5, split: int | None = None) -> list[dict]:
+    """Picks the param sets with the best in-sample metric on the train window of a split, the last one by default."""
+    split = results['split'].max() if split is None else split
+    fold = results[results['split'] == split].sort_values(f'train_{metric}', ascending=False, kind='stable')
+    return [{key: value.item() if hasattr(value, 'item') else value for key, value in row.items()}
+            for row in fold[grid_keys].head(top_n).to_dict('records')]
+
+
+def walk_forward_report(results: pd.DataFrame, grid_keys: list[str], metric: str = 'sharpe', top_n: int = 5) -> pd.DataFrame:
+    """Selects the top param sets of every split on its train window and returns their out-of-sample test metric.
+
+    Each row is one selected set of one split; the mean of test_{metric} estimates the live performance of the selection.
+    """
+    columns = ['split', *grid_keys, f'train_{metric}', f'test_{metric}']
+    folds = [fold.sort_values(f'train_{metric}', ascending=False, kind='stable').head(top_n)[columns]
+             for _, fold in results.groupby('split')]
+    return pd.concat(folds, ignore_index=True)
+
+
+def to_yaml_fragment(config: StratConfig, params: list[dict]) -> str:
+    """Renders the strategy config with the given params as a strategies.yaml fragment."""
+    strategy = asdict(config)
+    strategy['params'] = params
+    strat_class = strategy.pop('strat_class')
+    if strat_class:
+        strategy['class'] = strat_class
+    return yaml.safe_dump({'strategies': [strategy]}, sort_keys=False)
+
+
+def parse_grid_values(text: str) -> list[float | int]:
+    """Parses '10,20,50' or an inclusive range 'start:stop:step', e.g. '10:100:10'."""
+    if ':' in text:
+        start, stop, step = text.split(':')
+        if all(value.lstrip('-').isdigit() for value in (start, stop, step)):
+            return list(range(int(start), int(stop) + 1, int(step)))
+        values = np.arange(float(start), float(stop) + float(step) / 2, float(step))
+        return [round(float(value), 10) for value in values]
+    return [int(value) if value.lstrip('-').isdigit() else float(value) for value in text.split(',')]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sweep strategy params on local data and write the best sets as a strategies.yaml fragment.')
+    parser.add_argument('strat_id', type=int, help='Strategy id in the config file')
+    parser.add_argument('strat_class', nargs='?', default=None, help="Strategy class if not the config's, e.g. Strat002 or user_strategies.Strat002")
+    parser.add_argument('--grid', action='append', required=True, help='Param grid as name=values, e.g. window=10:200:10 or threshold=-1,0,1')
+    parser.add_argument('--live', action='store_true', help='Read the live config instead of config_test')
+    parser.add_argument('--folder', default='user_data')
+    parser.add_argument('--alpha-timeframe', default=None, help="Alpha table if not the price klines, e.g. 'funding'")
+    parser.add_argument('--price-timeframe', default=None)
+    parser.add_argument('--splits', type=int, default=4)
+    parser.add_argument('--train-frac', type=float, default=0.7)
+    parser.add_argument('--anchored', action='store_true')
+    parser.add_argument('--cost-bps', type=float, default=5.0)
+    parser.add_argument('--metric', default='sharpe')
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=None, help='Write the yaml fragment to this file instead of stdout')
+    args = parser.parse_args()
+
+    configs = ConfigManager(is_demo=not args.live).load_strategy_config()
+    config = next(config for config in configs if config.id == args.strat_id)
+    strat_cls = resolve_strat_class(args.strat_class) if args.strat_class else get_strat_class(config)
+    grid = {name: parse_grid_values(values) for name, values in (item.split('=', 1) for item in args.grid)}
+
+    price_timeframe = args.price_timeframe or config.timeframe
+    prices = load_local_data(config.symbol, price_timeframe, args.folder)['close']
+    df = load_local_data(config.symbol, args.alpha_timeframe, args.folder) if args.alpha_timeframe else prices.to_frame()
+
+    results = run_sweep(strat_cls, config, df, grid, prices, num_splits=args.splits, train_frac=args.train_frac, anchored=args.anchored,
+                        cost_bps=args.cost_bps, stats_timeframe=price_timeframe, max_workers=args.workers)
+    report = walk_forward_report(results, list(grid), args.metric, args.top)
+    logger.info(f'Walk-forward selection by train {args.metric}, out-of-sample test {args.metric} '
+                f'mean {report[f"test_{args.metric}"].mean():.3f}:\n{report.to_string(index=False)}')
+    fragment = to_yaml_fragment(config, select_top_params(results, list(grid), args.metric, args.top))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(fragment)
+        logger.info(f'Wrote top {args.top} param sets to {args.output}')
+    else:
+        print(fragment)
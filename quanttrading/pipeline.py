@@ -0,0 +1,63 @@
+import ccxt
+
+from typing import Callable
+import time
+
+from quanttrading.config_manager import StratConfig
+from quanttrading.data_fetcher import DataFetcher
+from quanttrading.netting import PortfolioNetting
+from quanttrading.position_book import PositionBook
+from quanttrading.position_engine import PositionEngine
+from quanttrading.strat_pool import StratPool
+from quanttrading.strat_registry import create_strategy
+from quanttrading.strategies import BaseStrat
+from quanttrading.trade_scheduler import ExchangeClock, TradeScheduler
+from quanttrading.trader import Trader
+from quanttrading.utils.log import init_logger
+from quanttrading.utils.telegram import TelegramNotifier
+from quanttrading.warm_up import warm_up_strategies
+
+
+logger = init_logger('pipeline')
+
+SYMBOL_CAPS = {}  # {symbol: max absolute position in contracts}
+ENFORCE_SIDE = False  # Clip each strategy's signal to its configured side
+
+class Pipeline:
+    """Builds the trading pipeline as the live bot runs it: DataFetcher, StratPool, PositionBook,
+    PortfolioNetting, PositionEngine, Trader and TradeScheduler.
+
+    main.py and replay.Replay both build it here, so a replay trades through the same netting, caps
+    and position book as the live bot. Strategies come from the configs through the class registry,
+    unless `strat_classes` ({strategy id: class}) overrides them, and are warmed up together.
+    Every component reads the time from one ExchangeClock, whose offset the scheduler syncs.
+    """
+    def __init__(self, exchange: ccxt.Exchange, strat_configs: list[StratConfig], folder: str, scheduler=None,
+                 clock: Callable[[], float] = time.time, strat_classes: dict[int, type[BaseStrat]] | None = None,
+                 max_workers: int = 8, notifier: TelegramNotifier | None = None, restore_snapshot: bool = False,
+                 symbol_caps: dict[str, float] | None = None, enforce_side: bool = ENFORCE_SIDE, rate_limit: int = 10) -> None:
+        self.exchange = exchange
+        self.strat_classes = strat_classes or {}
+        symbol_caps = SYMBOL_CAPS if symbol_caps is None else symbol_caps
+        self.clock = ExchangeClock(clock)
+
+        self.data_fetcher = DataFetcher(exchange, folder, store_type='columnar', clock=self.clock, incremental=True, rate_limit=rate_limit)
+        self.strats = [self.create_strategy(config) for config in strat_configs]
+        warm_up_strategies(self.strats, self.data_fetcher, max_workers=max_workers, restore_snapshot=restore_snapshot)
+
+        self.strat_pool = StratPool()
+        self.strat_pool.add_strategies(self.strats)
+
+        self.position_book = PositionBook(exchange, reconcile_interval=0, clock=self.clock)
+        self.netting = PortfolioNetting(self.strat_pool, self.data_fetcher, symbol_caps, enforce_side=enforce_side)
+        self.position_engine = PositionEngine(exchange, self.strat_pool, self.data_fetcher, self.position_book, netting=self.netting,
+                                              symbol_caps=symbol_caps, enforce_side=enforce_side)
+        self.trader = Trader(exchange, self.position_engine, self.strat_pool, max_workers=max_workers, notifier=notifier)
+        self.trade_scheduler = TradeScheduler(scheduler, self.trader, self.strat_pool, exchange_clock=self.clock)
+        logger.info(f'Built pipeline of {len(self.strats)} strategies on {len(self.strat_pool.strategies)} symbols')
+
+    def create_strategy(self, config: StratConfig) -> BaseStrat:
+        """Creates a strategy without warming it up, e.g. for ConfigWatcher."""
+        if config.id in self.strat_classes:
+            return self.strat_classes[config.id](config, self.data_fetcher, auto_init=False)
+        return create_strategy(config, self.data_fetcher)
@@ -0,0 +1,83 @@
+import ccxt
+
+from typing import Callable
+import threading
+import time
+
+from quanttrading.utils import log
+
+
+logger = log.init_logger('book')
+
+def get_signed_contracts(position: dict) -> float:
+    """Converts a ccxt position into signed contracts, positive for long and negative for short."""
+    if position['side'] == 'long':
+        return position['contracts']
+    elif position['side'] == 'short':
+        return -position['contracts']
+    return 0.0
+
+
+class PositionBook:
+    """Local position book, snapshotted with one fetch_positions call and kept current with our own fills.
+    
+    The book is reconciled against the exchange at most once every `reconcile_interval` seconds,
+    an interval of 0 reconciles on every refresh. A symbol whose last order may still fill, e.g. a
+    resting limit order, is reconciled on its next refresh regardless of the interval.
+    """
+    def __init__(self, exchange: ccxt.Exchange, reconcile_interval: float = 0.0, clock: Callable[[], float] = time.time) -> None:
+        self.exchange = exchange
+        self.reconcile_interval = reconcile_interval
+        self.clock = clock
+        
+        self.positions = {}  # {symbol: signed contracts}
+        self.unsettled = set()  # Symbols with an order whose fill is not final
+        self.last_reconcile = None
+        self.lock = threading.Lock()
+    
+    def refresh(self, symbols: list[str], force: bool = False) -> None:
+        """Reconciles the book with the exchange if the reconcile interval has passed."""
+        now = self.clock()
+        if (not force and self.last_reconcile is not None and now - self.last_reconcile < self.reconcile_interval
+                and self.unsettled.isdisjoint(symbols)):
+            return
+        
+        # Positions come back under unified symbols (e.g. BTC/USDT:USDT), map them to the ones we trade
+        markets = {symbol: self.exchange.market(symbol) for symbol in symbols}
+        unified_symbols = {market['symbol']: symbol for symbol, market in markets.items()}
+        
+        # Bybit rejects a list of more than one symbol, so fetch all positions of each settle coin and filter
+        if len(symbols) == 1:
+            positions = self.exchange.fetch_positions(list(symbols))
+        else:
+            settle_coins = sorted({market.get('settle') or 'USDT' for market in markets.values()})
+            positions = [position for settle in settle_coins for position in self.exchange.fetch_positions(params={'settleCoin': settle})]
+        
+        snapshot = {symbol: 0.0 for symbol in symbols}
+        for position in positions:
+            symbol = unified_symbols.get(position['symbol'])
+            if symbol is not None:
+                snapshot[symbol] += get_signed_contracts(position)
+        
+        with self.lock:
+            drifts = {symbol: pos for symbol, pos in snapshot.items() if symbol in self.positions and self.positions[symbol] != pos}
+            self.positions.update(snapshot)
+            self.unsettled.difference_update(snapshot)
+            self.last_reconcile = now
+        
+        for symbol, pos in drifts.items():
+            logger.debug('%s reconciled position to %s', symbol, pos)
+        logger.debug('Reconciled %d positions', len(snapshot))
+    
+    def get_position(self, symbol: str) -> float:
+        if symbol not in self.positions:
+            self.refresh([symbol], force=True)
+        return self.positions[symbol]
+    
+    def apply_fill(self, symbol: str, side: str, amount: float, final: bool = True) -> None:
+        """Books a fill; with final=False the rest of the order may still fill, so the symbol is reconciled before its next trade."""
+        with self.lock:
+            delta = amount if side == 'buy' else -amount
+            self.positions[symbol] = self.positions.get(symbol, 0.0) + delta
+            if not final:
+                self.unsettled.add(symbol)
@@ -1,41 +1,75 @@
 import ccxt
 
+from quanttrading.config_manager import SIDE_BOUNDS
+from quanttrading.netting import PortfolioNetting
+from quanttrading.position_book import PositionBook, get_signed_contracts
 from quanttrading.strat_pool import StratPool
 from quanttrading.data_fetcher import DataFetcher
 from quanttrading.strategies import BaseStrat
 from quanttrading.utils import log
+from quanttrading.utils.metrics import metrics
 
 
 logger = log.init_logger('pos')
 
 
 class PositionEngine:
-    def __init__(self, exchange: ccxt.Exchange, strat_pool: StratPool, data_fetcher: DataFetcher) -> None:
+    def __init__(self, exchange: ccxt.Exchange, strat_pool: StratPool, data_fetcher: DataFetcher, position_book: PositionBook | None = None,
+                 netting: PortfolioNetting | None = None, symbol_caps: dict[str, float] | None = None, enforce_side: bool = False) -> None:
         self.exchange = exchange
         self.strat_pool = strat_pool
         self.data_fetcher = data_fetcher
+        self.position_book = position_book  # Serves positions from a per-cycle snapshot when set
+        self.netting = netting  # Targets come from one matrix product per cycle when set, see update_signals
+        self.symbol_caps = symbol_caps or {}  # {symbol: max absolute target}, netting applies its own caps
+        self.enforce_side = enforce_side  # Clip signals to each strategy's side, off by default so signals are traded as emitted
     
     def fetch_current_pos(self, symbol: str) -> float:
-        position = self.exchange.fetch_position(symbol)
-
-        if position['side'] == 'long':
-            return position['contracts']
-        elif position['side'] == 'short':
-            return -position['contracts']
-        return 0.0
+        if self.position_book is not None:
+            return self.position_book.get_position(symbol)
+        
+        with metrics.span('fetch_position'):
+            position = self.exchange.fetch_position(symbol)
+        return get_signed_contracts(position)
+    
+    def refresh_positions(self, symbols: list[str]) -> None:
+        """Snapshots all positions in one call, if a position book is used."""
+        if self.position_book is not None:
+            with metrics.span('fetch_positions'):
+                self.position_book.refresh(symbols)
+    
+    def apply_fill(self, symbol: str, side: str, amount: float, final: bool = True) -> None:
+        if self.position_book is not None:
+            self.position_book.apply_fill(symbol, side, amount, final)
+    
+    def log_cache_stats(self) -> None:
+        self.data_fetcher.log_cache_stats()
+    
+    def update_signals(self, symbol: str, active_tfs: list[str], inactive_tfs: list[str]) -> None:
+        """Generates the signals of a symbol's strategies on active timeframes into the netting signal vector."""
+        for tf in active_tfs:
+            for strat in self.strat_pool.strategies[symbol][tf]:
+                self.netting.set_signal(strat, strat.generate_signal())
     
     def calculate_target_pos_by_strat(self, strat: BaseStrat, is_active: bool) -> float:
         """Calculates the target position for a specific strategy."""    
         if is_active:
             signal = strat.generate_signal()
         else:
-            signal = self.data_fetcher.fetch_signal_from_csv(strat.strat_name)
+            signal = self.data_fetcher.fetch_latest_signal(strat.strat_name)
         
-        logger.info(f'{strat.id:03d} {strat.symbol} {strat.timeframe} {strat.params} {"live" if is_active else "csv"}')
+        logger.debug('%03d %s %s %s %s', strat.id, strat.symbol, strat.timeframe, strat.params, 'live' if is_active else 'csv')
+        
+        if self.enforce_side:
+            lower, upper = SIDE_BOUNDS[strat.side]
+            if lower is not None:
+                signal = max(signal, lower)
+            if upper is not None:
+                signal = min(signal, upper)
         
         max_pos = strat.max_pos
         target_pos = signal * max_pos
-        logger.info(f'{strat.id:03d} {strat.symbol} {strat.timeframe} Target pos: {target_pos}')
+        logger.debug('%03d %s %s Target pos: %s', strat.id, strat.symbol, strat.timeframe, target_pos)
         
         return target_pos
     
@@ -44,7 +78,7 @@ class PositionEngine:
         strategies = self.strat_pool.strategies.get(symbol, {})
         target_pos = 0.0
         # logger.info(f'Calculating target position for {symbol} {timeframe} {"live" if is_active else "csv"}')
-        logger.info(f'{symbol} {timeframe}, {"live" if is_active else "csv"}, calculating target position')
+        logger.debug('%s %s, %s, calculating target position', symbol, timeframe, 'live' if is_active else 'csv')
         
         for strat in strategies[timeframe]:
             target_pos += self.calculate_target_pos_by_strat(strat, is_active)
@@ -53,15 +87,22 @@ class PositionEngine:
     
     def calculate_pos_delta(self, symbol: str, active_tfs: list[str], inactive_tfs: list[str]) -> float:
         """Calculates the delta between the target and current position for a given symbol."""
-        target_pos = 0.0
-        
-        # Calculate the total target position for active timeframe
-        for tf in active_tfs:
-            target_pos += self.calculate_target_pos_by_symbol(symbol, tf, is_active=True)
-        
-        # Calculate the total target position for inactive timeframes
-        for tf in inactive_tfs:
-            target_pos += self.calculate_target_pos_by_symbol(symbol, tf, is_active=False)
+        if self.netting is not None:
+            target_pos = self.netting.get_target(symbol)
+        else:
+            target_pos = 0.0
+            
+            # Calculate the total target position for active timeframe
+            for tf in active_tfs:
+                target_pos += self.calculate_target_pos_by_symbol(symbol, tf, is_active=True)
+            
+            # Calculate the total target position for inactive timeframes
+            for tf in inactive_tfs:
+                target_pos += self.calculate_target_pos_by_symbol(symbol, tf, is_active=False)
+            
+            cap = self.symbol_caps.get(symbol)
+            if cap is not None:
+                target_pos = min(max(target_pos, -cap), cap)
         
         current_pos = self.fetch_current_pos(symbol)
         pos_delta = target_pos - current_pos
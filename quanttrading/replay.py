@@ -0,0 +1,295 @@
+import pandas as pd
+import numpy as np
+import ccxt
+
+from datetime import datetime, timezone
+import argparse
+import logging
+import tempfile
+import threading
+import time
+
+from quanttrading.backtest import load_local_data
+from quanttrading.config_manager import ConfigManager, StratConfig
+from quanttrading.pipeline import Pipeline
+from quanttrading.strat_registry import get_strat_class, resolve_strat_class
+from quanttrading.strategies import BaseStrat
+from quanttrading.utils.log import init_logger
+from quanttrading.utils.recorder import ReplayingExchange, summarize_log
+from quanttrading.utils.timeframe import timeframe_to_ms
+
+
+logger = init_logger('replay')
+
+class SimClock:
+    """A settable clock in epoch seconds, passed wherever the live components take `clock`."""
+    def __init__(self, start: float) -> None:
+        self.now = float(start)
+        self.lock = threading.Lock()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def set(self, now: float) -> None:
+        with self.lock:
+            self.now = float(now)
+
+    def advance(self, seconds: float) -> None:
+        with self.lock:
+            self.now += seconds
+
+
+class ReplayExchange:
+    """In-process stand-in for the ccxt methods the bot calls, serving recorded 1m closes up to the clock.
+
+    Bars of any timeframe are built from the 1m closes; a bar still open at the current time closes at
+    the last finished minute, as on the exchange. Every price field of a bar carries its close.
+    Orders fill immediately and in full, market orders at the last close and limit orders at their price.
+    """
+    rateLimit = 0
+
+    def __init__(self, klines: dict[str, pd.DataFrame], clock: SimClock, funding_rates: dict[str, pd.DataFrame] | None = None,
+                 fee_bps: float = 0.0, precision: float = 0.001, max_limit: int = 1000) -> None:
+        self.clock = clock
+        self.fee_bps = fee_bps
+        self.precision = precision
+        self.max_limit = max_limit
+
+        # {symbol: (open times in ms, closes)} of the 1m bars
+        self.klines = {symbol: (pd.DatetimeIndex(df.index).as_unit('ms').asi8, df['close'].to_numpy(dtype=np.float64)) for symbol, df in klines.items()}
+        self.funding_rates = {symbol: (pd.DatetimeIndex(df.index).as_unit('ms').asi8, df['funding_rate'].to_numpy(dtype=np.float64))
+                              for symbol, df in (funding_rates or {}).items()}
+
+        self.positions = {}  # {symbol: signed contracts}
+        self.orders = []
+        self.fees = 0.0
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def count(self, method: str) -> None:
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+    def now_ms(self) -> int:
+        return int(self.clock() * 1000)
+
+    def get_last_close(self, symbol: str) -> float:
+        open_times, closes = self.klines[symbol]
+        # The last 1m bar finished at the current time
+        idx = int(np.searchsorted(open_times, self.now_ms() - 60_000, side='right')) - 1
+        return float(closes[max(idx, 0)])
+
+    def fetch_time(self) -> int:
+        return self.now_ms()
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int | None = None, limit: int | None = None, params: dict = {}) -> list:
+        self.count('fetch_ohlcv')
+        open_times, closes = self.klines[symbol]
+        tf_ms = timeframe_to_ms(timeframe)
+        now_ms = self.now_ms()
+        limit = min(limit or 200, self.max_limit)
+
+        first_open = max(-(-open_times[0] // tf_ms) * tf_ms, 0)
+        last_open = min(now_ms // tf_ms * tf_ms, open_times[-1] // tf_ms * tf_ms)
+        if since is None:
+            start = max(last_open - (limit - 1) * tf_ms, first_open)
+        else:
+            start = max(-(-since // tf_ms) * tf_ms, first_open)
+        if start > last_open:
+            return []
+
+        bar_opens = np.arange(start, last_open + 1, tf_ms, dtype=np.int64)[:limit]
+        close_minutes = np.minimum(bar_opens + tf_ms, now_ms // 60_000 * 60_000) - 60_000
+        idx = np.clip(np.searchsorted(open_times, close_minutes, side='right') - 1, 0, None)
+        bar_closes = closes[idx]
+        return [[int(ts), close, close, close, close, 0.0] for ts, close in zip(bar_opens.tolist(), bar_closes.tolist())]
+
+    def fetch_funding_rate_history(self, symbol: str, since: int | None = None, limit: int | None = None, params: dict = {}) -> list:
+        self.count('fetch_funding_rate_history')
+        timestamps, rates = self.funding_rates[symbol]
+        end = int(np.searchsorted(timestamps, self.now_ms(), side='right'))
+        limit = min(limit or 200, 200)
+        start = max(end - limit, 0) if since is None else int(np.searchsorted(timestamps, since, side='left'))
+        return [{'timestamp': int(ts), 'fundingRate': float(rate)} for ts, rate in zip(timestamps[start:end][:limit], rates[start:end][:limit])]
+
+    def get_position(self, symbol: str) -> dict:
+        contracts = self.positions.get(symbol, 0.0)
+        side = 'long' if contracts > 0 else 'short' if contracts < 0 else None
+        return {'symbol': symbol, 'side': side, 'contracts': abs(contracts)}
+
+    def fetch_position(self, symbol: str, params: dict = {}) -> dict:
+        self.count('fetch_position')
+        return self.get_position(symbol)
+
+    def fetch_positions(self, symbols: list[str] | None = None, params: dict = {}) -> list[dict]:
+        self.count('fetch_positions')
+        if symbols is not None and len(symbols) > 1:
+            raise ccxt.ArgumentsRequired('bybit fetchPositions() does not accept an array with more than one symbol')
+        return [self.get_position(symbol) for symbol in symbols or list(self.positions)]
+
+    def market(self, symbol: str) -> dict:
+        return {'symbol': symbol, 'precision': {'amount': self.precision}}
+
+    def fetch_order_book(self, symbol: str, limit: int | None = None, params: dict = {}) -> dict:
+        self.count('fetch_order_book')
+        close = self.get_last_close(symbol)
+        return {'bids': [[close, 1.0]], 'asks': [[close, 1.0]]}
+
+    def create_order(self, symbol: str, type: str, side: str, amount: float, price: float | None = None, params: dict = {}) -> dict:
+        self.count('create_order')
+        fill_price = price if type == 'limit' and price is not None else self.get_last_close(symbol)
+        fee = amount * fill_price * self.fee_bps / 1e4
+
+        with self.lock:
+            self.positions[symbol] = self.positions.get(symbol, 0.0) + (amount if side == 'buy' else -amount)
+            self.fees += fee
+            order = {
+                'id': str(len(self.orders) + 1),
+                'timestamp': self.now_ms(),
+                'symbol': symbol,
+                'type': type,
+                'side': side,
+                'amount': amount,
+                'price': fill_price,
+                'filled': amount,
+                'fee': fee,
+                'status': 'closed',
+            }
+            self.orders.append(order)
+        return order
+
+
+class Replay:
+    """Runs the live pipeline, built by quanttrading.pipeline as in main.py, on a SimClock.
+
+    The clock jumps from one bar boundary to the next and the scheduler's bar close handler runs
+    synchronously at each one, so a replay runs as fast as the trading cycles themselves.
+    Trade alerts are not sent.
+    """
+    def __init__(self, strat_specs: list[tuple[type[BaseStrat], StratConfig]], exchange: ReplayExchange, clock: SimClock,
+                 folder: str | None = None, max_workers: int = 1, trigger_delay: float = 0.0) -> None:
+        self.exchange = exchange
+        self.clock = clock
+        self.trigger_delay = trigger_delay  # Seconds after the boundary at which each cycle fires
+        self.folder = folder or tempfile.mkdtemp(prefix='replay_')
+
+        # The exchange is local, so no request budget is needed
+        self.pipeline = Pipeline(exchange, [config for _, config in strat_specs], self.folder, clock=clock,
+                                 strat_classes={config.id: strat_cls for strat_cls, config in strat_specs},
+                                 max_workers=max_workers, rate_limit=1_000_000)
+        self.data_fetcher = self.pipeline.data_fetcher
+        self.strat_pool = self.pipeline.strat_pool
+        self.position_engine = self.pipeline.position_engine
+        self.trader = self.pipeline.trader
+        self.trade_scheduler = self.pipeline.trade_scheduler
+
+        self.cycle_times = []
+
+    def run(self, end: float) -> dict[str, float]:
+        """Fires every bar close from the current clock time up to `end` (epoch seconds) and returns throughput stats."""
+        tick = self.trade_scheduler.get_tick_interval()
+        boundary = (int(self.clock()) // tick + 1) * tick
+        start = time.perf_counter()
+
+        while boundary <= end:
+            self.clock.set(boundary + self.trigger_delay)
+            cycle_start = time.perf_counter()
+            self.trade_scheduler.on_bar_close()
+            self.cycle_times.append(time.perf_counter() - cycle_start)
+            boundary += tick
+
+        elapsed = time.perf_counter() - start
+        cycle_times = np.array(self.cycle_times) if self.cycle_times else np.zeros(1)
+        stats = {
+            'cycles': len(self.cycle_times),
+            'elapsed': elapsed,
+            'cycles_per_sec': len(self.cycle_times) / elapsed if elapsed > 0 else 0.0,
+            'speedup': len(self.cycle_times) * tick / elapsed if elapsed > 0 else 0.0,
+            'cycle_p50_ms': float(np.percentile(cycle_times, 50) * 1000),
+            'cycle_max_ms': float(cycle_times.max() * 1000),
+            'orders': len(self.exchange.orders),
+            'fees': float(self.exchange.fees),
+        }
+        logger.info(f'Replayed {stats["cycles"]} cycles in {elapsed:.2f}s ({stats["speedup"]:.0f}x real time), {stats["orders"]} orders')
+        return stats
+
+    def get_orders(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.exchange.orders)
+        if not df.empty:
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+            df.set_index('timestamp', inplace=True)
+        return df
+
+
+def init_replay(strat_specs: list[tuple[type[BaseStrat], StratConfig]], start: str, folder: str = 'user_data', fee_bps: float = 0.0, max_workers: int = 1) -> Replay:
+    """Builds a replay on the 1m klines (and funding rates, if any) stored locally, starting at `start` (e.g. '2024-06-01')."""
+    klines, funding_rates = {}, {}
+    for symbol in {config.symbol for _, config in strat_specs}:
+        klines[symbol] = load_local_data(symbol, '1m', folder)
+        try:
+            funding_rates[symbol] = load_local_data(symbol, 'funding', folder)
+        except FileNotFoundError:
+            pass
+
+    clock = SimClock(pd.Timestamp(start, tz='UTC').timestamp())
+    exchange = ReplayExchange(klines, clock, funding_rates, fee_bps=fee_bps)
+    return Replay(strat_specs, exchange, clock, max_workers=max_workers)
+
+def replay_request_log(path: str, strat_configs: list[StratConfig], folder: str | None = None,
+                       strat_classes: dict[int, type[BaseStrat]] | None = None, delay_factor: float = 0.0, max_workers: int = 1) -> dict:
+    """Serves a request log recorded by main.py (record_log=<path>) back through the pipeline, one Trader.trade per recorded cycle.
+
+    Trader.trade marks each cycle with its active timeframes, e.g. 'cycle 1m,5m', and replaying the mark moves
+    the clock to its recorded time, so every cycle sends the requests it sent live.
+    """
+    exchange = ReplayingExchange(path, delay_factor)
+    pipeline = Pipeline(exchange, strat_configs, folder or tempfile.mkdtemp(prefix='replay_'), clock=exchange.clock,
+                        strat_classes=strat_classes, max_workers=max_workers, rate_limit=1_000_000)
+    exchange.reset_stats()
+
+    cycles = [segment['mark'] for segment in summarize_log(path) if (segment['mark'] or '').startswith('cycle ')]
+    cycle_times = []
+    for label in cycles:
+        for timeframe in label.split(' ', 1)[1].split(','):
+            pipeline.trader.activate_timeframe(timeframe)
+        cycle_start = time.perf_counter()
+        pipeline.trader.trade()
+        cycle_times.append(time.perf_counter() - cycle_start)
+
+    cycle_times = np.array(cycle_times) if cycle_times else np.zeros(1)
+    return {
+        'cycles': len(cycles),
+        'cycle_min_ms': float(cycle_times.min() * 1000),
+        'cycle_p50_ms': float(np.percentile(cycle_times, 50) * 1000),
+        'calls': exchange.get_call_stats(),
+        'unused_responses': exchange.remaining(),
+        'positions': dict(pipeline.position_book.positions),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay the live pipeline on locally stored 1m klines.')
+    parser.add_argument('start', help='Replay start, e.g. 2024-06-01')
+    parser.add_argument('end', help='Replay end, e.g. 2024-06-02')
+    parser.add_argument('strats', nargs='+', help="Strategy ids, with a class if not the config's, e.g. 2 or 2=user_strategies.Strat002")
+    parser.add_argument('--live', action='store_true', help='Read the live config instead of config_test')
+    parser.add_argument('--folder', default='user_data')
+    parser.add_argument('--fee-bps', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--quiet', action='store_true', help='Only log warnings and the replay summary')
+    args = parser.parse_args()
+
+    configs = {config.id: config for config in ConfigManager(is_demo=not args.live).load_strategy_config()}
+    strat_specs = []
+    for item in args.strats:
+        strat_id, _, class_path = item.partition('=')
+        config = configs[int(strat_id)]
+        strat_specs.append((resolve_strat_class(class_path) if class_path else get_strat_class(config), config))
+
+    replay = init_replay(strat_specs, args.start, args.folder, fee_bps=args.fee_bps, max_workers=args.workers)
+    if args.quiet:
+        logging.disable(logging.INFO)
+    stats = replay.run(pd.Timestamp(args.end, tz='UTC').timestamp())
+    logging.disable(logging.NOTSET)
+
+    print(stats)
+    print(f'Final positions: {replay.exchange.positions}, at {datetime.fromtimestamp(replay.clock(), tz=timezone.utc)}')
@@ -0,0 +1,336 @@
+import pandas as pd
+import numpy as np
+
+from abc import ABC, abstractmethod
+import argparse
+import glob
+import io
+import json
+import os
+import shutil
+
+from quanttrading.utils.log import init_logger
+
+
+logger = init_logger('store')
+
+class SignalStore(ABC):
+    """Persists signal DataFrames indexed by timestamp, one table per strategy name."""
+    def __init__(self, folder: str) -> None:
+        self.folder = folder
+        os.makedirs(self.folder, exist_ok=True)
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame, name: str) -> None:
+        """Appends new rows and upserts the last stored bar."""
+        pass
+
+    @abstractmethod
+    def read(self, name: str) -> pd.DataFrame:
+        """Reads the full table for the given name."""
+        pass
+
+    @abstractmethod
+    def read_last(self, name: str) -> pd.Series:
+        """Reads only the last stored row for the given name."""
+        pass
+
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        pass
+
+    @abstractmethod
+    def delete(self, name: str) -> None:
+        pass
+
+
+class CsvSignalStore(SignalStore):
+    """Stores each table as a single CSV file which is rewritten on every write."""
+    def get_path(self, name: str) -> str:
+        return f'{self.folder}/{name}.csv'
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.get_path(name))
+
+    def delete(self, name: str) -> None:
+        if self.exists(name):
+            os.remove(self.get_path(name))
+
+    def write(self, df: pd.DataFrame, name: str) -> None:
+        file_path = self.get_path(name)
+
+        if df is None or df.empty:
+            logger.info(f'No data to save for {name} strategy')
+            df =pd.DataFrame()
+
+        if not os.path.exists(file_path):
+            df.to_csv(file_path)
+            logger.info(f'Saved {len(df)} rows for {name} strategy')
+        else:
+            old_df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+            combined_df = pd.concat([old_df, df])
+            combined_df = combined_df[~combined_df.index.duplicated(keep='last')]
+
+            combined_df.to_csv(file_path)
+            appended_rows = len(combined_df) - len(old_df)
+
+            if appended_rows == 0:
+                logger.debug('Updated latest data for %s strategy', name)
+            else:
+                logger.debug('Appended %d rows of data for %s strategy', appended_rows, name)
+
+    def read(self, name: str) -> pd.DataFrame:
+        return pd.read_csv(self.get_path(name), index_col=0, parse_dates=True)
+
+    def read_last(self, name: str, block_size: int = 4096) -> pd.Series:
+        """Parses the header and the last line only by seeking backwards from the end of the file."""
+        with open(self.get_path(name), 'rb') as f:
+            header = f.readline()
+            header_end = f.tell()
+
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            tail = b''
+            pos = end
+            # Read blocks backwards until the tail holds a full non-empty last line
+            while pos > header_end and tail.rstrip(b'\r\n').count(b'\n') < 1:
+                pos = max(header_end, pos - block_size)
+                f.seek(pos)
+                tail = f.read(end - pos)
+
+        last_line = tail.rstrip(b'\r\n').split(b'\n')[-1]
+        if not last_line.strip():
+            raise ValueError(f'No rows in csv for {name} strategy')
+
+        df = pd.read_csv(io.BytesIO(header + last_line), index_col=0, parse_dates=True)
+        return df.iloc[-1]
+
+
+class ColumnarSignalStore(SignalStore):
+    """Stores each table as a folder of fixed-width binary column files.
+
+    Layout: {folder}/{name}/columns.json, timestamp.bin (int64 ns) and col_NNN.bin (float64).
+    Stored history is immutable: a write only touches rows at or after the last stored timestamp,
+    so each tick costs one upsert of the last bar plus the appended tail. Older rows are added with
+    prepend(), which rewrites the table into a new folder and swaps it in by rename.
+    """
+    TS_FILE = 'timestamp.bin'
+    SCHEMA_FILE = 'columns.json'
+    ITEM_SIZE = 8
+
+    def get_path(self, name: str) -> str:
+        return f'{self.folder}/{name}'
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(f'{self.get_path(name)}/{self.SCHEMA_FILE}') or self.recover(name)
+
+    def recover(self, name: str) -> bool:
+        """Restores a table whose swap in replace() was interrupted between its two renames."""
+        path = self.get_path(name)
+        if os.path.exists(path) or not os.path.exists(f'{path}.old/{self.SCHEMA_FILE}'):
+            return False
+        os.rename(f'{path}.old', path)
+        logger.warning(f'Recovered {name} from an interrupted rewrite')
+        return True
+
+    def delete(self, name: str) -> None:
+        shutil.rmtree(self.get_path(name), ignore_errors=True)
+
+    def replace(self, df: pd.DataFrame, name: str) -> None:
+        """Rewrites the whole table; the old one stays complete on disk until the new one is fully written."""
+        path = self.get_path(name)
+        tmp_name = f'{name}.tmp'
+        self.delete(tmp_name)
+        self.write(df, tmp_name)
+
+        if not self.exists(name):
+            os.rename(self.get_path(tmp_name), path)
+            return
+        self.delete(f'{name}.old')
+        os.rename(path, f'{path}.old')
+        os.rename(self.get_path(tmp_name), path)
+        self.delete(f'{name}.old')
+
+    def prepend(self, df: pd.DataFrame, name: str) -> None:
+        """Adds the rows older than the first stored bar."""
+        if not self.exists(name):
+            self.write(df, name)
+            return
+
+        first_ts = self.read_first_timestamp(name)
+        head = df[pd.DatetimeIndex(df.index).as_unit('ns').asi8 < first_ts]
+        if head.empty:
+            return
+        self.replace(pd.concat([head, self.read(name)]), name)
+        logger.info(f'Prepended {len(head)} rows to {name}')
+
+    def load_columns(self, name: str) -> list[str]:
+        with open(f'{self.get_path(name)}/{self.SCHEMA_FILE}', 'r') as f:
+            return json.load(f)
+
+    def save_columns(self, name: str, columns: list[str]) -> None:
+        with open(f'{self.get_path(name)}/{self.SCHEMA_FILE}', 'w') as f:
+            json.dump(columns, f)
+
+    def get_column_file(self, name: str, col_idx: int) -> str:
+        return f'{self.get_path(name)}/col_{col_idx:03d}.bin'
+
+    def get_num_rows(self, name: str) -> int:
+        ts_file = f'{self.get_path(name)}/{self.TS_FILE}'
+        if not os.path.exists(ts_file):
+            return 0
+        return os.path.getsize(ts_file) // self.ITEM_SIZE
+
+    def read_first_timestamp(self, name: str) -> int | None:
+        if self.get_num_rows(name) == 0:
+            return None
+        return int(np.fromfile(f'{self.get_path(name)}/{self.TS_FILE}', dtype=np.int64, count=1)[0])
+
+    def read_last_timestamp(self, name: str) -> int | None:
+        """Reads the last stored timestamp (ns) without loading the column."""
+        num_rows = self.get_num_rows(name)
+        if num_rows == 0:
+            return None
+
+        with open(f'{self.get_path(name)}/{self.TS_FILE}', 'rb') as f:
+            f.seek((num_rows - 1) * self.ITEM_SIZE)
+            return int(np.frombuffer(f.read(self.ITEM_SIZE), dtype=np.int64)[0])
+
+    def write_at(self, file_path: str, row: int, values: np.ndarray) -> None:
+        """Writes values starting at the given row and truncates anything after them."""
+        mode = 'r+b' if os.path.exists(file_path) else 'w+b'
+        with open(file_path, mode) as f:
+            f.seek(row * self.ITEM_SIZE)
+            f.write(values.tobytes())
+            f.truncate()
+
+    def write(self, df: pd.DataFrame, name: str) -> None:
+        if df is None or df.empty:
+            logger.info(f'No data to save for {name} strategy')
+            return
+
+        path = self.get_path(name)
+        os.makedirs(path, exist_ok=True)
+
+        timestamps = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+        num_rows = self.get_num_rows(name)
+        last_ts = self.read_last_timestamp(name)
+
+        # Only rows at or after the last stored bar are written
+        if last_ts is None:
+            start_row, tail = 0, slice(None)
+        else:
+            tail_start = int(np.searchsorted(timestamps, last_ts, side='left'))
+            tail = slice(tail_start, None)
+            is_upsert = tail_start < len(timestamps) and timestamps[tail_start] == last_ts
+            start_row = num_rows - 1 if is_upsert else num_rows
+
+        tail_ts = timestamps[tail]
+        if len(tail_ts) == 0:
+            logger.debug('No new rows to save for %s strategy', name)
+            return
+
+        columns = self.load_columns(name) if self.exists(name) else []
+        new_columns = [col for col in df.columns if col not in columns]
+        for col in new_columns:
+            # Backfill history of a new column with NaN so all columns keep the same length
+            columns.append(col)
+            self.write_at(self.get_column_file(name, len(columns) - 1), 0, np.full(start_row, np.nan))
+        if new_columns:
+            self.save_columns(name, columns)
+
+        tail_df = df.iloc[tail]
+        for col_idx, col in enumerate(columns):
+            if col in tail_df.columns:
+                values = tail_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                values = np.full(len(tail_ts), np.nan)
+            self.write_at(self.get_column_file(name, col_idx), start_row, values)
+
+        self.write_at(f'{path}/{self.TS_FILE}', start_row, tail_ts.astype(np.int64))
+
+        appended_rows = start_row + len(tail_ts) - num_rows
+        if num_rows == 0:
+            logger.info(f'Saved {appended_rows} rows for {name} strategy')
+        elif appended_rows == 0:
+            logger.debug('Updated latest data for %s strategy', name)
+        else:
+            logger.debug('Appended %d rows of data for %s strategy', appended_rows, name)
+
+    def read(self, name: str) -> pd.DataFrame:
+        return self.read_range(name)
+
+    def read_range(self, name: str, start: int | None = None, end: int | None = None) -> pd.DataFrame:
+        """Reads the rows with start <= timestamp <= end (ns); only the timestamp column is read in full."""
+        if not self.exists(name):
+            raise FileNotFoundError(f'No signal store for {name} strategy')
+
+        path = self.get_path(name)
+        num_rows = self.get_num_rows(name)
+        timestamps = np.fromfile(f'{path}/{self.TS_FILE}', dtype=np.int64, count=num_rows)
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        last = num_rows if end is None else int(np.searchsorted(timestamps, end, side='right'))
+        count = max(last - first, 0)
+
+        data = {}
+        for col_idx, col in enumerate(self.load_columns(name)):
+            data[col] = np.fromfile(self.get_column_file(name, col_idx), dtype=np.float64, count=count, offset=first * self.ITEM_SIZE)
+
+        index = pd.DatetimeIndex(timestamps[first:first + count].astype('datetime64[ns]'), name='timestamp')
+        return pd.DataFrame(data, index=index)
+
+    def read_last(self, name: str) -> pd.Series:
+        """Reads one value per column file by seeking to the last row."""
+        last_ts = self.read_last_timestamp(name) if self.exists(name) else None
+        if last_ts is None:
+            raise ValueError(f'No rows in signal store for {name} strategy')
+
+        row = self.get_num_rows(name) - 1
+        values = {}
+        for col_idx, col in enumerate(self.load_columns(name)):
+            with open(self.get_column_file(name, col_idx), 'rb') as f:
+                f.seek(row * self.ITEM_SIZE)
+                values[col] = np.frombuffer(f.read(self.ITEM_SIZE), dtype=np.float64)[0]
+
+        return pd.Series(values, name=pd.Timestamp(last_ts))
+
+
+signal_store_types = {
+    'csv': CsvSignalStore,
+    'columnar': ColumnarSignalStore,
+}
+
+def init_signal_store(store_type: str, folder: str) -> SignalStore:
+    if store_type not in signal_store_types:
+        raise ValueError(f'Invalid signal store type: {store_type}')
+    return signal_store_types[store_type](folder)
+
+def migrate_csv_signals(csv_folder: str, store: SignalStore) -> list[str]:
+    """Imports every non-empty {name}.csv in csv_folder into the given store and returns the migrated names."""
+    migrated = []
+    for file_path in sorted(glob.glob(f'{csv_folder}/*.csv')):
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+
+        if store.exists(name):
+            logger.info(f'Skipped {name}, already in store')
+            continue
+        if df.empty:
+            logger.info(f'Skipped {name}, no rows')
+            continue
+
+        store.write(df, name)
+        migrated.append(name)
+
+    logger.info(f'Migrated {len(migrated)} csv files from {csv_folder}')
+    return migrated
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Migrate signal CSV files into another signal store backend.')
+    parser.add_argument('csv_folder', help='Folder containing the {strat_name}.csv files, e.g. user_data/data')
+    parser.add_argument('--store-type', default='columnar', choices=list(signal_store_types))
+    parser.add_argument('--dest', default=None, help='Destination folder, defaults to csv_folder')
+    args = parser.parse_args()
+
+    migrate_csv_signals(args.csv_folder, init_signal_store(args.store_type, args.dest or args.csv_folder))
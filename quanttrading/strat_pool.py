@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 from quanttrading.strategies import BaseStrat
 from quanttrading.utils import log
 
@@ -24,8 +26,47 @@ class StratPool:
         #             '5m': [5m_z_score_mom srtategy]},
         # 'ETHUSDT': {'1m': [1m_z_score_mom srtategy], '3m': [3m_z_score_mom srtategy]},
         # 'BNBUSDT': {'3m': [3m_z_score_mom srtategy]}}    
+        self.version = 0  # Bumped on every change, so dependents know when to rebuild
+        self.rebuild_indexes()
+    
+    def rebuild_indexes(self) -> None:
+        """Rebuilds the read-only lookups used by every cycle; called after each add and remove."""
+        timeframe_key = lambda tf: self.timeframe_order[tf]
+        symbol_timeframes = {symbol: tuple(sorted(tfs, key=timeframe_key)) for symbol, tfs in self.strategies.items()}
+        timeframes = tuple(sorted({tf for tfs in symbol_timeframes.values() for tf in tfs}, key=timeframe_key))
+        
+        self.timeframes = timeframes
+        self.symbol_timeframes = MappingProxyType(symbol_timeframes)  # {symbol: (sorted timeframes)}
+        self.timeframe_symbols = MappingProxyType({
+            tf: tuple(symbol for symbol, tfs in symbol_timeframes.items() if tf in tfs) for tf in timeframes
+        })  # {timeframe: (symbols)}
+        self.timeframe_strategies = MappingProxyType({
+            tf: tuple(strat for symbol in self.timeframe_symbols[tf] for strat in self.strategies[symbol][tf]) for tf in timeframes
+        })  # {timeframe: (strategies)}
+        self.sessions = {}  # {active timeframes: ((symbol, active tfs, inactive tfs), ...)}, filled on demand
+        self.version += 1
+    
+    def get_sessions(self, active_tfs: list[str]) -> tuple[tuple[str, tuple[str, ...], tuple[str, ...]], ...]:
+        """Get (symbol, active timeframes, inactive timeframes) of every symbol with a strategy on an active timeframe.
+        
+        The result depends only on the set of active timeframes, so it is computed once per set until the pool changes.
+        """
+        key = tuple(active_tfs)
+        sessions = self.sessions.get(key)
+        if sessions is None:
+            sessions = []
+            for symbol, tfs in self.symbol_timeframes.items():
+                symbol_active_tfs = tuple(tf for tf in tfs if tf in key)
+                if symbol_active_tfs:
+                    sessions.append((symbol, symbol_active_tfs, tuple(tf for tf in tfs if tf not in key)))
+            sessions = self.sessions[key] = tuple(sessions)
+        return sessions
     
     def add_strategy(self, strat: BaseStrat) -> None:
+        self.insert_strategy(strat)
+        self.rebuild_indexes()
+    
+    def insert_strategy(self, strat: BaseStrat) -> None:
         if strat.symbol not in self.strategies:
             self.strategies[strat.symbol] = {}
         
@@ -36,15 +77,30 @@ class StratPool:
     
     def add_strategies(self, strats: list[BaseStrat]) -> None:
         for strat in strats:
-            self.add_strategy(strat)
+            self.insert_strategy(strat)
+        self.rebuild_indexes()
+    
+    def remove_strategy(self, strat: BaseStrat) -> None:
+        """Removes a strategy, dropping its timeframe and symbol once they have no strategies left."""
+        symbol_timeframes = self.strategies.get(strat.symbol, {})
+        strategies = symbol_timeframes.get(strat.timeframe, [])
+        if strat not in strategies:
+            raise ValueError(f'Strategy {strat.id} is not in the pool')
+        
+        strategies.remove(strat)
+        if not strategies:
+            del symbol_timeframes[strat.timeframe]
+        if not symbol_timeframes:
+            del self.strategies[strat.symbol]
+        self.rebuild_indexes()
+    
+    def get_strategies(self) -> list[BaseStrat]:
+        """Get a flat list of all the strategies in the pool."""
+        return [strat for symbol_timeframes in self.strategies.values() for strats in symbol_timeframes.values() for strat in strats]
     
     def get_timeframes_for_symbol(self, symbol: str) -> list[str]:
         """Get a sorted list of all the timeframes available for a given symbol, sorted by timeframe order."""
-        if symbol not in self.strategies:
-            return []
-        
-        timeframes = self.strategies[symbol].keys()
-        return sorted(timeframes, key=lambda tf: self.timeframe_order[tf])
+        return list(self.symbol_timeframes.get(symbol, ()))
     
     # def get_strategies(self, symbol: str, timeframe: str) -> list[BaseStrat]:
     #     return self.strategies[symbol][timeframe]
@@ -69,11 +125,7 @@ class StratPool:
     
     def get_timeframes(self) -> list[str]:
         """Get a sorted list of all the timeframes available in the pool, sorted by timeframe order."""
-        timeframes = set()  # Use a set to avoid duplicate timeframes
-        for symbol_timeframes in self.strategies.values():
-            timeframes.update(symbol_timeframes.keys())
-            
-        return sorted(timeframes, key=lambda tf: self.timeframe_order[tf])
+        return list(self.timeframes)
     
 
     
@@ -0,0 +1,45 @@
+from functools import lru_cache
+import importlib
+
+from quanttrading.config_manager import StratConfig
+from quanttrading.data_fetcher import DataFetcher
+from quanttrading.strategies import BaseStrat
+from quanttrading.utils.log import init_logger
+
+
+logger = init_logger('registry')
+
+DEFAULT_PACKAGE = 'user_strategies'
+
+@lru_cache(maxsize=None)
+def resolve_strat_class(class_path: str) -> type[BaseStrat]:
+    """Imports a strategy class on first use from a name in user_strategies, e.g. 'Strat002', or a full path, e.g. 'my_strats.mom.MomStrat'."""
+    module_name, _, class_name = class_path.rpartition('.')
+    module = importlib.import_module(module_name or DEFAULT_PACKAGE)
+    try:
+        strat_cls = getattr(module, class_name)
+    except AttributeError:
+        raise ValueError(f"Strategy class '{class_path}' not found") from None
+
+    if not (isinstance(strat_cls, type) and issubclass(strat_cls, BaseStrat)):
+        raise ValueError(f"'{class_path}' is not a BaseStrat subclass")
+    logger.debug('Resolved %s to %s.%s', class_path, strat_cls.__module__, strat_cls.__name__)
+    return strat_cls
+
+
+def get_strat_class(config: StratConfig) -> type[BaseStrat]:
+    if not config.strat_class:
+        raise ValueError(f"Strategy {config.id} has no 'class' in its config")
+    return resolve_strat_class(config.strat_class)
+
+
+def create_strategy(config: StratConfig, data_fetcher: DataFetcher | None, auto_init: bool = False) -> BaseStrat:
+    return get_strat_class(config)(config, data_fetcher, auto_init=auto_init)
+
+
+def create_strategies(configs: list[StratConfig], data_fetcher: DataFetcher | None, auto_init: bool = False) -> list[BaseStrat]:
+    """Creates one strategy per config, importing only the strategy modules the configs name.
+
+    auto_init defaults to False so the strategies can be warmed up together, see quanttrading.warm_up.
+    """
+    return [create_strategy(config, data_fetcher, auto_init) for config in configs]
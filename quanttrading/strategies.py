@@ -2,16 +2,22 @@ import pandas as pd
 import numpy as np
 
 from abc import ABC, abstractmethod
+import logging
 
 from quanttrading.config_manager import StratConfig
 from quanttrading.data_fetcher import DataFetcher
+from quanttrading.indicators import IndicatorCache, StreamingRollingStats, rolling_mean_matrix, rolling_std_matrix
 from quanttrading.utils.log import init_logger
+from quanttrading.utils.metrics import metrics
 
 
 logger = init_logger('strats')
 
 class BaseStrat(ABC):
-    def __init__(self, config: StratConfig, data_fetcher: DataFetcher):
+    vectorized = False  # Set True in strategies implementing calculate_signal_matrix
+    streaming = False  # Set True to update rolling indicators on each new bar instead of recomputing the full frame
+    
+    def __init__(self, config: StratConfig, data_fetcher: DataFetcher | None, auto_init: bool = True):
         self.config = config
         self.data_fetcher = data_fetcher
         
@@ -19,6 +25,7 @@ class BaseStrat(ABC):
         self.name = config.name
         self.symbol = config.symbol
         self.timeframe = config.timeframe
+        self.side = config.side
         self.order_type = config.order_type
         self.max_pos = config.max_pos
         
@@ -27,8 +34,20 @@ class BaseStrat(ABC):
         self.max_window = self.get_max_window()
         
         self.strat_name = f'{self.id:03d}-{self.name}'
+        if self.vectorized and type(self).calculate_signal_matrix is BaseStrat.calculate_signal_matrix:
+            logger.warning(f'{type(self).__name__} sets vectorized but does not implement calculate_signal_matrix, using calculate_signal_df per param set')
+            self.vectorized = False
+        self.rolling_stats = {}  # {window: StreamingRollingStats}, used in streaming mode
+        
+        # Without a data fetcher (e.g. in backtests) the strategy only computes signals, uncached
+        self.indicator_cache: IndicatorCache | None = None
+        if self.data_fetcher is not None:
+            self.indicator_cache = self.data_fetcher.indicator_cache
+            self.data_fetcher.register_window(self.symbol, self.timeframe, self.max_window)
 
-        self.init_data()
+        # Pass auto_init=False to defer init_data to a shared warm-up, see quanttrading.warm_up
+        if auto_init:
+            self.init_data()
 
     def init_data(self) -> None:
         """Fetches alpha, calculates signals, and exports to CSV."""
@@ -48,8 +67,34 @@ class BaseStrat(ABC):
     
     def calculate_agg_signal_df(self, df: pd.DataFrame) -> pd.DataFrame:
         """Calculates the aggregated signals for multiple parameter sets and adds them to DataFrame."""
+        with metrics.span('signal'):
+            signals_df = self.calculate_signals(df, export=True)
+        signal = signals_df['signal'].iloc[-1]
+        logger.info('%03d %s %s Signal(agg): %s', self.id, self.symbol, self.timeframe, signal)
+        
+        # Export aggregated signal to CSV
+        with metrics.span('signal_store_write'):
+            self.data_fetcher.to_signal_csv(signals_df, self.strat_name)
+        self.data_fetcher.update_latest_signal(self.strat_name, signal)
+        
+        return signals_df  # Return the DataFrame containing all signals
+    
+    def calculate_signals(self, df: pd.DataFrame, export: bool = False) -> pd.DataFrame:
+        """Calculates the per-parameter signals and their mean as 'signal'. This is the code path shared by live trading and backtests."""
         df = df.copy()
-        signals_df = pd.DataFrame(index=df.index)
+        
+        if self.vectorized:
+            signals_df = self.calculate_signals_vectorized(df, export)
+        else:
+            signals_df = self.calculate_signals_by_param(df, export)
+            
+        # Aggregate signals
+        signals_df['signal'] = signals_df.mean(axis=1)
+        return signals_df
+    
+    def calculate_signals_by_param(self, df: pd.DataFrame, export: bool = True) -> pd.DataFrame:
+        """Calculates the signal of each parameter set in turn, exporting each one to its own CSV."""
+        signals = {}
         
         for param_set in zip(*self.params.values()):
             param_dict = dict(zip(self.params.keys(), param_set))
@@ -58,41 +103,103 @@ class BaseStrat(ABC):
             df_temp = self.calculate_signal_df(df, **param_dict)
             
             # Export signal to CSV
-            strat_param_name = f"{self.strat_name}-" + "-".join(f'{v}' for v in param_dict.values())
-            self.data_fetcher.to_signal_csv(df_temp, strat_param_name)
-            signal = df_temp['signal'].iloc[-1]
-            logger.info(f'{self.id:03d} {self.symbol} {self.timeframe} {param_dict} Signal: {signal}')
+            if export:
+                strat_param_name = f"{self.strat_name}-" + "-".join(f'{v}' for v in param_dict.values())
+                self.data_fetcher.to_signal_csv(df_temp, strat_param_name)
+                signal = df_temp['signal'].iloc[-1]
+                logger.debug('%03d %s %s %s Signal: %s', self.id, self.symbol, self.timeframe, param_dict, signal)
             
             # Concatenate signals to DataFrame
             col_name = f'signal_' + '-'.join(f'{v}' for v in param_dict.values())
-            signals_df[col_name] = df_temp['signal']
+            signals[col_name] = df_temp['signal']
+        
+        return pd.DataFrame(signals, index=df.index)
+    
+    def calculate_signals_vectorized(self, df: pd.DataFrame, export: bool = True) -> pd.DataFrame:
+        """Calculates the signals of all parameter sets in one call to calculate_signal_matrix.
+        
+        Unlike calculate_signals_by_param, no table is written per parameter set: the per-param columns are
+        exported with the aggregated signal by calculate_agg_signal_df, in one write per cycle.
+        """
+        param_arrays = {key: np.asarray(values) for key, values in self.params.items()}
+        signal_matrix = self.calculate_signal_matrix(df, **param_arrays)  # shape (bars, param sets)
+        
+        signals = {}
+        log_params = export and logger.isEnabledFor(logging.DEBUG)
+        for i, param_set in enumerate(zip(*self.params.values())):
+            param_dict = dict(zip(self.params.keys(), param_set))
+            if log_params:
+                logger.debug('%03d %s %s %s Signal: %s', self.id, self.symbol, self.timeframe, param_dict, signal_matrix[-1, i])
             
-        # Aggregate signals
-        signals_df['signal'] = signals_df.mean(axis=1)
-        signal = signals_df['signal'].iloc[-1]
-        logger.info(f'{self.id:03d} {self.symbol} {self.timeframe} Signal(agg): {signal}')
+            col_name = f'signal_' + '-'.join(f'{v}' for v in param_dict.values())
+            signals[col_name] = signal_matrix[:, i]
         
-        # Export aggregated signal to CSV
-        self.data_fetcher.to_signal_csv(signals_df, self.strat_name)
+        return pd.DataFrame(signals, index=df.index)
+    
+    def calculate_signal_matrix(self, df: pd.DataFrame, **param_arrays: np.ndarray) -> np.ndarray:
+        """Returns the signals of every parameter set as a (bars, param sets) array.
         
-        return signals_df  # Return the DataFrame containing all signals
+        Strategies setting `vectorized` must override it; without an override they fall back to calculate_signal_df per param set.
+        """
+        raise NotImplementedError(f'{type(self).__name__} does not implement calculate_signal_matrix')
     
     def calculate_z_score(self, df: pd.DataFrame, window) -> pd.DataFrame:
         window = int(window)
-        df['ma'] = df['close'].rolling(window).mean()
-        df['std'] = df['close'].rolling(window).std()
+        if self.streaming:
+            df['ma'], df['std'] = self.update_rolling_stats(df, window)
+        else:
+            df['ma'] = self.get_indicator(df, 'ma', window, lambda: df['close'].rolling(window).mean().to_numpy())
+            df['std'] = self.get_indicator(df, 'std', window, lambda: df['close'].rolling(window).std().to_numpy())
         df['z'] = (df['close'] - df[f'ma']) / df[f'std']
         return df
 
     def calculate_ma_pct_diff(self, df: pd.DataFrame, window) -> pd.DataFrame:
         window = int(window)
-        df['ma'] = df['close'].rolling(window).mean()
+        if self.streaming:
+            df['ma'], _ = self.update_rolling_stats(df, window)
+        else:
+            df['ma'] = self.get_indicator(df, 'ma', window, lambda: df['close'].rolling(window).mean().to_numpy())
         df['pct_diff'] = df['close'] / df['ma'] - 1
         return df
+    
+    def get_indicator(self, df: pd.DataFrame, indicator: str, window: int, compute) -> np.ndarray:
+        """Reads an indicator on close from the shared per-bar cache, computing it on a miss."""
+        if self.indicator_cache is None:
+            return np.asarray(compute(), dtype=np.float64)
+        return self.indicator_cache.get(self.symbol, self.timeframe, indicator, window, df['close'], compute)
+    
+    def get_indicator_matrix(self, df: pd.DataFrame, indicator: str, windows: np.ndarray) -> np.ndarray:
+        """Returns a (bars, windows) matrix of a rolling indicator on close, computing only the windows missing from the cache.
+        
+        Supported indicators are 'ma' and 'std'.
+        """
+        matrix_funcs = {'ma': rolling_mean_matrix, 'std': rolling_std_matrix}
+        cache = self.indicator_cache
+        close = df['close']
+        unique_windows = np.unique(windows).tolist()
+        
+        columns = cache.lookup(self.symbol, self.timeframe, indicator, unique_windows, close) if cache is not None else {}
+        
+        missing = [window for window in unique_windows if window not in columns]
+        if missing:
+            computed = matrix_funcs[indicator](close.to_numpy(dtype=np.float64), missing)
+            for i, window in enumerate(missing):
+                columns[window] = computed[:, i]
+                if cache is not None:
+                    cache.store(self.symbol, self.timeframe, indicator, window, close, computed[:, i])
+        
+        return np.column_stack([columns[window] for window in np.asarray(windows).tolist()])
+    
+    def update_rolling_stats(self, df: pd.DataFrame, window: int) -> tuple[pd.Series, pd.Series]:
+        """Returns the rolling mean and std of close, feeding only new or revised bars to the window's stats."""
+        if window not in self.rolling_stats:
+            self.rolling_stats[window] = StreamingRollingStats(window)
+        return self.rolling_stats[window].update(df['close'])
 
     def generate_signal(self) -> float:
         """Fetches data, calculates signal, logs it, and returns the latest signal."""
-        df = self.fetch_alpha()
+        with metrics.span('fetch_alpha'):
+            df = self.fetch_alpha()
         df = self.calculate_agg_signal_df(df)
         
         return df['signal'].iloc[-1]
@@ -1,105 +1,141 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+from typing import Callable
+import math
+import threading
+import time
 
 from quanttrading.utils import log
+from quanttrading.utils.metrics import metrics
+from quanttrading.utils.timeframe import TIMEFRAME_SECONDS
 from quanttrading.strat_pool import StratPool
 from quanttrading.trader import Trader
 
 
 logger = log.init_logger('scheduler')
 
+class ExchangeClock:
+    """The local clock shifted by `offset`, the exchange time minus the local time in seconds.
+
+    TradeScheduler measures the offset; the DataFetcher and PositionBook given the same instance
+    derive bar boundaries from the same time as the scheduler.
+    """
+    def __init__(self, clock: Callable[[], float] = time.time, offset: float = 0.0) -> None:
+        self.clock = clock
+        self.offset = offset
+
+    def __call__(self) -> float:
+        return self.clock() + self.offset
+
+
 class TradeScheduler:
-    def __init__(self, scheduler, trader: Trader, stratpool: StratPool) -> None:
+    """Fires one trading cycle per bar boundary with the exact set of timeframes closing at that instant.
+
+    All boundaries are derived from a single clock: the local clock shifted by `clock_offset`
+    (exchange time minus local time, in seconds), aligned to UTC epoch like exchange bars.
+    Pass `exchange_clock` to share that clock with the components fetching bars.
+    """
+    def __init__(self, scheduler, trader: Trader, stratpool: StratPool, clock_offset: float = 0.0, clock: Callable[[], float] = time.time,
+                 exchange_clock: ExchangeClock | None = None) -> None:
         self.scheduler = scheduler
         self.trader = trader
         self.stratpool = stratpool
         self.timeframes = self.stratpool.get_timeframes()  # ['1m', '3m', '5m']
-    
+
+        self.exchange_clock = exchange_clock or ExchangeClock(clock, clock_offset)
+        self.clock = self.exchange_clock.clock
+        self.lateness = []  # Trigger lateness of recent cycles in seconds
+        self.max_lateness_samples = 1440
+        self.early_trigger_tolerance = 0.5  # Seconds a trigger may fire before its boundary
+        self.cycle_lock = threading.Lock()  # Held for a whole cycle, so config reloads apply between cycles
+
     def add_jobs(self) -> None:
-        for tf in self.timeframes:
-            func = getattr(self, f'add_{tf}_job')
-            func()
-            
-            logger.info(f'Added activate {tf} job')
-    
-    def add_1m_job(self) -> None:
-        self.scheduler.add_job(
-            func=self.trader.activate_timeframe,
-            trigger='cron',
-            args=['1m'],
-            second='0',
-            id='activate_1m'
-        )
+        tick = self.get_tick_interval()
+        next_boundary = (math.floor(self.get_exchange_time() / tick) + 1) * tick
 
-    def add_3m_job(self) -> None:
         self.scheduler.add_job(
-            func=self.trader.activate_timeframe,
-            trigger='cron',
-            args=['3m'],
-            minute='*/3',
-            id='activate_3m'
+            func=self.on_bar_close,
+            trigger='interval',
+            seconds=tick,
+            start_date=datetime.fromtimestamp(next_boundary - self.clock_offset, tz=timezone.utc),
+            coalesce=True,
+            id='bar_close',
         )
 
-    def add_5m_job(self) -> None:
-        self.scheduler.add_job(
-            func=self.trader.activate_timeframe,
-            trigger='cron',
-            args=['5m'],
-            minute='*/5',
-            id='activate_5m'
-        )
-        
-    def add_15m_job(self) -> None:
-        self.scheduler.add_job(
-            func=self.trader.activate_timeframe,
-            trigger='cron',
-            args=['15m'],
-            minute='*/15',
-            id='activate_15m'
-        )
-        
-    def add_30m_job(self) -> None:
-        self.scheduler.add_job(
-            func=self.trader.activate_timeframe,
-            trigger='cron',
-            args=['30m'],
-            minute='*/30',
-            id='activate_30m'
-        )
-        
-    def add_1h_job(self) -> None:
-        self.scheduler.add_job(
-            func=self.trader.activate_timeframe,
-            trigger='cron',
-            args=['1h'],
-            minute=0,
-            id='activate_1h'
-        )
-        
-    def add_4h_job(self) -> None:
-        self.scheduler.add_job(
-            func=self.trader.activate_timeframe,
-            trigger='cron',
-            args=['4h'],
-            hour='*/4',
-            id='activate_4h'
-        )
-        
-    def add_8h_job(self) -> None:
-        self.scheduler.add_job(
-            func=self.trader.activate_timeframe,
-            trigger='cron',
-            args=['8h'],
-            hour='*/8',
-            id='activate_8h'
-        )
-        
-    def add_1d_job(self) -> None:
-        self.scheduler.add_job(
-            func=self.trader.activate_timeframe,
-            trigger='cron',
-            args=['1d'],
-            hour=0,
-            id='activate_1d'
-        )
-        
\ No newline at end of file
+        logger.info(f'Added bar close job every {tick}s for {self.timeframes}, first at {datetime.fromtimestamp(next_boundary, tz=timezone.utc)}')
+
+    def update_timeframes(self) -> None:
+        """Re-reads the timeframes from the strategy pool, rescheduling the bar close job if the tick changed."""
+        old_tick = self.get_tick_interval()
+        self.timeframes = self.stratpool.get_timeframes()
+        if self.get_tick_interval() != old_tick and self.scheduler is not None and self.scheduler.get_job('bar_close'):
+            self.scheduler.remove_job('bar_close')
+            self.add_jobs()
+
+    @property
+    def clock_offset(self) -> float:
+        return self.exchange_clock.offset
+
+    @clock_offset.setter
+    def clock_offset(self, offset: float) -> None:
+        self.exchange_clock.offset = offset
+
+    def get_exchange_time(self) -> float:
+        return self.exchange_clock()
+
+    def sync_clock_offset(self, exchange) -> float:
+        """Measures the exchange clock offset from the exchange server time, compensating for half the round trip."""
+        start = self.clock()
+        server_time = exchange.fetch_time() / 1000
+        end = self.clock()
+
+        self.clock_offset = server_time - (start + end) / 2
+        logger.info(f'Exchange clock offset: {self.clock_offset * 1000:.1f} ms')
+        return self.clock_offset
+
+    def get_tick_interval(self) -> int:
+        """Returns the largest interval (seconds) on which every timeframe boundary falls."""
+        return math.gcd(*[TIMEFRAME_SECONDS[tf] for tf in self.timeframes]) if self.timeframes else 60
+
+    def get_closing_timeframes(self, boundary: int) -> list[str]:
+        """Returns the timeframes whose bar closes at the given boundary (seconds since epoch)."""
+        return [tf for tf in self.timeframes if boundary % TIMEFRAME_SECONDS[tf] == 0]
+
+    def on_bar_close(self) -> None:
+        with self.cycle_lock:
+            self.run_cycle()
+
+    def run_cycle(self) -> None:
+        now = self.get_exchange_time()
+        tick = self.get_tick_interval()
+        # A late trigger still belongs to the boundary before it; only allow for firing slightly early on clock jitter
+        boundary = math.floor((now + self.early_trigger_tolerance) / tick) * tick
+        lateness = now - boundary
+
+        self.lateness.append(lateness)
+        del self.lateness[:-self.max_lateness_samples]
+
+        closing_tfs = self.get_closing_timeframes(boundary)
+        if not closing_tfs:
+            logger.debug('No timeframe closes at %s', datetime.fromtimestamp(boundary, tz=timezone.utc).time())
+            return
+
+        logger.info(f'Bar close {datetime.fromtimestamp(boundary, tz=timezone.utc):%H:%M:%S} {closing_tfs}, trigger lateness {lateness * 1000:.1f} ms')
+
+        for tf in closing_tfs:
+            self.trader.activate_timeframe(tf)
+        self.trader.trade()
+
+        # Time from the bar close until every order of the cycle is placed
+        cycle_lateness = self.get_exchange_time() - boundary
+        metrics.observe('trigger_lateness_seconds', lateness)
+        metrics.observe('cycle_lateness_seconds', cycle_lateness)
+        logger.info(f'Cycle finished {cycle_lateness * 1000:.1f} ms after bar close')
+
+    def get_lateness_stats(self) -> dict[str, float]:
+        if not self.lateness:
+            return {}
+        return {
+            'last': self.lateness[-1],
+            'mean': sum(self.lateness) / len(self.lateness),
+            'max': max(self.lateness),
+        }
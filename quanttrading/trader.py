@@ -1,19 +1,28 @@
 import ccxt
 
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from quanttrading.position_engine import PositionEngine
 from quanttrading.strat_pool import StratPool
 from quanttrading.utils import log
+from quanttrading.utils.metrics import metrics
+from quanttrading.utils.telegram import TelegramNotifier
 
 
 logger = log.init_logger('trader')
 
 class Trader():
-    def __init__(self, exchange: ccxt.Exchange, position_engine: PositionEngine, strat_pool: StratPool) -> None:
+    def __init__(self, exchange: ccxt.Exchange, position_engine: PositionEngine, strat_pool: StratPool, max_workers: int = 1,
+                 notifier: TelegramNotifier | None = None) -> None:
         self.exchange = exchange
         self.position_engine = position_engine
         self.strat_pool = strat_pool
+        self.notifier = notifier  # Queues trade alerts, sent from its own thread
+        
+        # Symbols are traded in parallel when max_workers > 1, each symbol's steps stay sequential in one task
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='trade') if max_workers > 1 else None
         self.active_tf_dict = {
             '1m': False,
             '3m': False,
@@ -30,7 +39,7 @@ class Trader():
         """Set the state of the current timeframe and the lower timeframes to True"""
         self.active_tf_dict[timeframe] = True
         
-        logger.info(f'activated {timeframe} trading session')
+        logger.info('activated %s trading session', timeframe)
     
     def deactivate_timeframes(self) -> None:
         """Reset the state of all timeframes to False"""
@@ -45,31 +54,46 @@ class Trader():
     
     def get_active_timeframes_for_symbol(self, symbol: str) -> list[str]:
         """Get the list of active timeframes for a specific symbol"""
-        return [timeframe for timeframe in self.get_active_timeframes() if timeframe in self.strat_pool.strategies[symbol]]
+        return [timeframe for timeframe in self.strat_pool.get_timeframes_for_symbol(symbol) if self.active_tf_dict[timeframe]]
     
     def trade_by_symbol(self, symbol: str, active_tfs: list[str], inactive_tfs: list[str], type='limit') -> None:
-        pos_delta = self.position_engine.calculate_pos_delta(symbol, active_tfs, inactive_tfs)
+        with metrics.span('pos_delta'):
+            pos_delta = self.position_engine.calculate_pos_delta(symbol, active_tfs, inactive_tfs)
 
         if pos_delta == 0:
-            logger.debug(f'No {symbol} trade required')
+            logger.debug('No %s trade required', symbol)
             return
         
         side = 'buy' if pos_delta > 0 else 'sell'
-        self.place_order(symbol, side, abs(pos_delta), type)
+        order = self.place_order(symbol, side, abs(pos_delta), type)
+        
+        # Market orders without a reported fill are assumed filled. The rest of a limit order may fill after this cycle,
+        # so the book reconciles the symbol before its next trade instead of sending the same delta again
+        filled = order.get('filled')
+        if filled is None:
+            filled = abs(pos_delta) if type == 'market' else 0.0
+        self.position_engine.apply_fill(symbol, side, filled, final=type == 'market' or filled >= abs(pos_delta))
         
         updated_position = self.position_engine.fetch_current_pos(symbol)
-        logger.info(f'{symbol} Updated position: {updated_position}')
+        logger.info('%s Updated position: %s', symbol, updated_position)
+        
+        if self.notifier is not None:
+            self.notifier.notify(f'{symbol} {side} {type} {abs(pos_delta)}, filled {filled}, position {updated_position}')
     
-    def place_order(self, symbol: str, side: str, amount: float, type: str) -> None:
+    def place_order(self, symbol: str, side: str, amount: float, type: str) -> dict:
         if type == 'market':
-            self.exchange.create_order(symbol=symbol, type=type, side=side, amount=amount)
-            logger.info(f'Created a {side} {type} order for {amount} {symbol} contracts')
+            with metrics.span('create_order'):
+                order = self.exchange.create_order(symbol=symbol, type=type, side=side, amount=amount)
+            logger.info('Created a %s %s order for %s %s contracts', side, type, amount, symbol)
         elif type == 'limit':
             best_bid = self.fetch_best_bid(symbol)
-            self.exchange.create_order(symbol=symbol, type=type, side=side, amount=amount, price=best_bid)
-            logger.info(f'Created a {side} {type} order for {amount} {symbol} contracts at {best_bid}')
+            with metrics.span('create_order'):
+                order = self.exchange.create_order(symbol=symbol, type=type, side=side, amount=amount, price=best_bid)
+            logger.info('Created a %s %s order for %s %s contracts at %s', side, type, amount, symbol, best_bid)
         else:
             raise ValueError('Invalid order type')
+        
+        return order
     
     def trade(self, delay: float | None = None) -> None:
         if delay:
@@ -80,27 +104,78 @@ class Trader():
             logger.info('No active trading sessions')
             return
         
-        logger.info(f'{active_tfs} trading session start')
-       
-        for symbol in self.strat_pool.strategies.keys():
-            symbol_active_tfs = self.get_active_timeframes_for_symbol(symbol)
+        # Timeframes are deactivated even if the cycle fails, so the next cycle only trades its own closing timeframes
+        try:
+            logger.info('%s trading session start', active_tfs)
             
-            # Skip if no active timeframes for the symbol
-            if not symbol_active_tfs:
-                continue
+            # A RecordingExchange splits its request log into cycles, which ReplayingExchange serves back in order
+            mark = getattr(self.exchange, 'mark', None)
+            if mark is not None:
+                mark(f'cycle {",".join(active_tfs)}')
             
-            symbol_tfs = self.strat_pool.get_timeframes_for_symbol(symbol)
-            symbol_inactive_tfs = [tf for tf in symbol_tfs if tf not in symbol_active_tfs]
+            # Symbols without a strategy on an active timeframe are left out
+            symbol_sessions = self.strat_pool.get_sessions(active_tfs)
+            for symbol, symbol_active_tfs, symbol_inactive_tfs in symbol_sessions:
+                logger.debug('%s, active_tfs: %s, inactive_tfs: %s', symbol, symbol_active_tfs, symbol_inactive_tfs)
             
-            logger.info(f'{symbol}, active_tfs: {symbol_active_tfs}, inactive_tfs: {symbol_inactive_tfs}')
-            self.trade_by_symbol(symbol, symbol_active_tfs, symbol_inactive_tfs)
+            with metrics.span('cycle'):
+                self.position_engine.refresh_positions([session[0] for session in symbol_sessions])
+                
+                # With netting, every active signal is generated before the targets of all symbols are netted at once
+                netting = self.position_engine.netting
+                if netting is not None:
+                    netting.sync()
+                    failed = self.run_sessions(self.position_engine.update_signals, symbol_sessions)
+                    with metrics.span('netting'):
+                        netting.update_targets()
+                    
+                    # A symbol whose signals failed to update would be netted from stale ones, so it is not traded this cycle
+                    if failed:
+                        logger.warning('Not trading %s, signal update failed', sorted(failed))
+                        symbol_sessions = tuple(session for session in symbol_sessions if session[0] not in failed)
+                
+                self.run_sessions(self.trade_by_symbol, symbol_sessions)
+            metrics.end_cycle()
+            
+            logger.info('%s trading session completed', active_tfs)
+            self.position_engine.log_cache_stats()
+        finally:
+            self.deactivate_timeframes()
+    
+    def run_sessions(self, func, symbol_sessions: tuple[tuple[str, tuple[str, ...], tuple[str, ...]], ...]) -> set[str]:
+        """Calls func(symbol, active_tfs, inactive_tfs) for every session, in parallel when an executor is set.
         
-        logger.info(f'{active_tfs} trading session completed')
+        Returns the symbols whose call raised; the error is logged and the other sessions still run.
+        """
+        if self.executor is not None:
+            return self.trade_concurrently(symbol_sessions, func)
         
-        self.deactivate_timeframes()
+        failed = set()
+        for session in symbol_sessions:
+            try:
+                func(*session)
+            except Exception as e:
+                logger.error(f'Error trading {session[0]}: {e}')
+                failed.add(session[0])
+        return failed
+    
+    def trade_concurrently(self, symbol_sessions: tuple[tuple[str, tuple[str, ...], tuple[str, ...]], ...], func=None) -> set[str]:
+        """Trades all symbols in parallel and waits for every one of them to finish. Returns the symbols that failed."""
+        func = func or self.trade_by_symbol
+        futures = {self.executor.submit(func, *session): session[0] for session in symbol_sessions}
         
+        failed = set()
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f'Error trading {futures[future]}: {e}')
+                failed.add(futures[future])
+        return failed
+    
     def fetch_best_bid(self, symbol: str) -> float:
-        orderbook = self.exchange.fetch_order_book(symbol, limit=1)
+        with metrics.span('order_book'):
+            orderbook = self.exchange.fetch_order_book(symbol, limit=1)
 
         if not orderbook['bids']:
             logger.error(f'No bids available for {symbol}')
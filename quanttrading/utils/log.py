@@ -1,31 +1,124 @@
+import atexit
+import json
 import logging
 import os
+import queue
 import time
-from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 
 
-def init_logger(logger_name: str) -> logging.Logger:
-    folder = 'user_data'
+LOG_FORMAT = '%(asctime)s - %(levelname)-8s - %(name)-9s - %(message)s'
+LOG_LEVEL = os.getenv('log_level', 'INFO').upper()  # Default level of init_logger, e.g. log_level=DEBUG python main.py
+
+# Arguments of these types may change before the writer thread formats the record
+MUTABLE_ARG_TYPES = (list, dict, set, bytearray)
+
+log_queue = queue.SimpleQueue()
+listener = None
+
+
+class LocalQueueHandler(QueueHandler):
+    """Enqueues records untouched, leaving message formatting to the writer thread.
+
+    The queue never leaves the process, so records need not be made picklable first. Only records
+    with mutable arguments are formatted here, so they show the values at the time of the call.
+    """
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if isinstance(record.args, tuple) and any(isinstance(arg, MUTABLE_ARG_TYPES) for arg in record.args):
+                record.msg, record.args = record.getMessage(), None
+            self.enqueue(record)
+        except Exception:
+            self.handleError(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one compact JSON object per line."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'name': record.name,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(',', ':'), default=str)
+
+
+def name_rotated_file(default_name: str) -> str:
+    """Names rotated logs {logs_folder}/{YYYYMMDD}.log (or .jsonl) after the day they cover."""
+    folder, file_name = os.path.split(default_name)
+    base, day = file_name.rsplit('.', 1)
+    return f'{folder}/{day}{os.path.splitext(base)[1]}'
+
+
+def init_rotating_handler(file_path: str, formatter: logging.Formatter) -> TimedRotatingFileHandler:
+    handler = TimedRotatingFileHandler(file_path, when='midnight', utc=True)
+    handler.suffix = '%Y%m%d'
+    handler.namer = name_rotated_file
+    handler.setLevel(logging.DEBUG)
+    handler.setFormatter(formatter)
+    return handler
+
+
+def configure_logging(folder: str = 'user_data', console_level: int = logging.INFO, jsonl: bool = False) -> None:
+    """(Re)starts the single writer thread which owns the log files and the console output.
+
+    Text logs go to {folder}/logs/quanttrading.log and rotate at UTC midnight to {YYYYMMDD}.log;
+    jsonl=True adds a structured quanttrading.jsonl sink rotating the same way.
+    """
+    global listener
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
     logs_folder = f'{folder}/logs'
     os.makedirs(logs_folder, exist_ok=True)
-    
-    log_file = f'{logs_folder}/{datetime.now(timezone.utc).strftime("%Y%m%d")}.log'
-    
-    logger = logging.getLogger(logger_name)
-    logger.setLevel(logging.DEBUG)
-    
-    formatter = logging.Formatter('%(asctime)s - %(levelname)-8s - %(name)-9s - %(message)s')
-    logging.Formatter.converter = time.gmtime
-    
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    formatter.converter = time.gmtime
+
     stream_handler = logging.StreamHandler()
-    stream_handler.setLevel(logging.INFO)
+    stream_handler.setLevel(console_level)
     stream_handler.setFormatter(formatter)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+
+    handlers = [init_rotating_handler(f'{logs_folder}/quanttrading.log', formatter), stream_handler]
+    if jsonl:
+        handlers.append(init_rotating_handler(f'{logs_folder}/quanttrading.jsonl', JsonFormatter()))
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+
+def stop_logging() -> None:
+    """Flushes the queue and stops the writer thread."""
+    global listener
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        listener = None
+
+
+atexit.register(stop_logging)
+
+
+def init_logger(logger_name: str, level: int | str | None = None) -> logging.Logger:
+    """Returns a logger feeding the shared queue, so logging never blocks the calling thread on I/O.
+
+    `level` defaults to LOG_LEVEL (INFO unless the log_level env var says otherwise). Records below it
+    are dropped before their message is formatted; pass the arguments of hot-path messages %-style
+    (logger.debug('%s', x)) so they are only formatted when emitted.
+    """
+    if listener is None:
+        configure_logging()
+
+    logger = logging.getLogger(logger_name)
+    logger.setLevel(LOG_LEVEL if level is None else level)
+    if not any(isinstance(handler, LocalQueueHandler) for handler in logger.handlers):
+        logger.addHandler(LocalQueueHandler(log_queue))
+    logger.propagate = False
 
     return logger
@@ -0,0 +1,183 @@
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import bisect
+import threading
+import time
+
+from quanttrading.utils.log import init_logger
+
+
+logger = init_logger('metrics')
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    """Cumulative-bucket histogram in Prometheus' layout, plus a window of recent samples for quantiles."""
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS, num_recent: int = 1024) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=num_recent)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return float('nan')
+        values = sorted(self.recent)
+        return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def format_labels(**labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+
+class Span:
+    def __init__(self, metrics: 'Metrics', stage: str) -> None:
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self) -> 'Span':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.add_span(self.stage, time.perf_counter() - self.start)
+
+
+class NullSpan:
+    def __enter__(self) -> 'NullSpan':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Metrics:
+    """Timing spans around the stages of a trading cycle, aggregated into histograms.
+
+    Every span is observed in `stage_seconds` and added to the running total of its stage for the
+    current cycle; end_cycle() moves those totals into `cycle_stage_seconds`. While disabled, span()
+    returns a shared no-op context manager, so instrumented code only pays for one attribute check.
+    """
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.histograms = {}  # {(metric, stage): Histogram}
+            self.gauges = {}  # {metric: value}
+            self.cycle_totals = {}  # {stage: seconds} of the cycle in progress
+            self.num_cycles = 0
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def span(self, stage: str) -> Span | NullSpan:
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, stage)
+
+    def get_histogram(self, metric: str, stage: str = '') -> Histogram:
+        key = (metric, stage)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram()
+        return self.histograms[key]
+
+    def add_span(self, stage: str, seconds: float) -> None:
+        with self.lock:
+            self.get_histogram('stage_seconds', stage).observe(seconds)
+            self.cycle_totals[stage] = self.cycle_totals.get(stage, 0.0) + seconds
+
+    def observe(self, metric: str, value: float) -> None:
+        """Records a value of a cycle-level metric, e.g. cycle_lateness_seconds."""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.get_histogram(metric).observe(value)
+            self.gauges[metric] = value
+
+    def end_cycle(self) -> None:
+        """Moves the stage totals of the finished cycle into the per-cycle histograms."""
+        if not self.enabled:
+            return
+        with self.lock:
+            for stage, seconds in self.cycle_totals.items():
+                self.get_histogram('cycle_stage_seconds', stage).observe(seconds)
+            self.cycle_totals = {}
+            self.num_cycles += 1
+
+    def render(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        lines = [f'quanttrading_cycles_total {self.num_cycles}']
+        with self.lock:
+            for metric, value in sorted(self.gauges.items()):
+                lines.append(f'quanttrading_{metric}_last {value:.6f}')
+
+            for (metric, stage), hist in sorted(self.histograms.items()):
+                name = f'quanttrading_{metric}'
+                stage_label = {'stage': stage} if stage else {}
+                cumulative = 0
+                for bound, count in zip(list(hist.buckets) + ['+Inf'], hist.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{format_labels(**stage_label, le=bound)} {cumulative}')
+                lines.append(f'{name}_sum{format_labels(**stage_label)} {hist.sum:.6f}')
+                lines.append(f'{name}_count{format_labels(**stage_label)} {hist.count}')
+        return '\n'.join(lines) + '\n'
+
+    def log_summary(self) -> None:
+        """Logs one line with cycle lateness quantiles and the mean per-cycle time of each stage."""
+        if not self.enabled:
+            return
+        with self.lock:
+            lateness = self.histograms.get(('cycle_lateness_seconds', ''))
+            stages = {stage: hist for (metric, stage), hist in self.histograms.items() if metric == 'cycle_stage_seconds'}
+
+            summary = f'{self.num_cycles} cycles'
+            if lateness is not None and lateness.count:
+                summary += (f', lateness p50 {lateness.quantile(0.5) * 1000:.0f} ms, p95 {lateness.quantile(0.95) * 1000:.0f} ms, '
+                            f'max {max(lateness.recent) * 1000:.0f} ms')
+            stage_means = ', '.join(f'{stage} {hist.sum / hist.count * 1000:.1f}' for stage, hist in sorted(stages.items(), key=lambda item: -item[1].sum))
+        logger.info(f'{summary}; mean ms per cycle: {stage_means}')
+
+    def start_http_server(self, port: int = 9100, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serves the metrics at http://host:port/metrics from a daemon thread."""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        logger.info(f'Serving metrics at http://{host}:{port}/metrics')
+        return server
+
+
+metrics = Metrics()
@@ -0,0 +1,59 @@
+from collections import deque
+import threading
+import time
+
+from quanttrading.utils.metrics import metrics
+
+
+class RateLimiter:
+    """Thread-safe sliding-window limiter allowing at most `max_calls` per `period` seconds."""
+    def __init__(self, max_calls: int, period: float = 1.0) -> None:
+        self.max_calls = max_calls
+        self.period = period
+        self.calls = deque()
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Blocks until a call fits in the budget, then records it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.calls and now - self.calls[0] >= self.period:
+                    self.calls.popleft()
+                
+                if len(self.calls) < self.max_calls:
+                    self.calls.append(now)
+                    return
+                
+                wait = self.period - (now - self.calls[0])
+            time.sleep(wait)
+
+
+class RateLimitedExchange:
+    """Wraps a ccxt exchange so every network call through it draws from one shared RateLimiter.
+    
+    Other attributes, such as market() or markets, are passed through untouched.
+    """
+    network_methods = {
+        'fetch_ohlcv',
+        'fetch_funding_rate_history',
+        'fetch_position',
+        'fetch_positions',
+        'fetch_order_book',
+        'create_order',
+    }
+    
+    def __init__(self, exchange, rate_limiter: RateLimiter) -> None:
+        self.exchange = exchange
+        self.rate_limiter = rate_limiter
+    
+    def __getattr__(self, name: str):
+        attr = getattr(self.exchange, name)
+        if name not in self.network_methods:
+            return attr
+        
+        def limited_call(*args, **kwargs):
+            with metrics.span('rate_limit_wait'):
+                self.rate_limiter.acquire()
+            return attr(*args, **kwargs)
+        return limited_call
@@ -0,0 +1,228 @@
+from collections import deque
+from typing import Callable
+import argparse
+import gzip
+import json
+import threading
+import time
+
+import ccxt
+
+
+recorded_methods = {
+    'fetch_ohlcv',
+    'fetch_funding_rate_history',
+    'fetch_position',
+    'fetch_positions',
+    'fetch_order_book',
+    'create_order',
+    'fetch_time',
+}
+
+def open_log(path: str, mode: str):
+    """Opens a request log as text, gzip-compressed if the path ends with .gz."""
+    return gzip.open(path, f'{mode}t') if path.endswith('.gz') else open(path, mode)
+
+
+def get_call_key(method: str, args: tuple, kwargs: dict) -> str:
+    return json.dumps([method, list(args), kwargs], sort_keys=True, separators=(',', ':'), default=str)
+
+
+class CallStats:
+    """Per-method call counts and latencies of an exchange wrapper."""
+    def __init__(self) -> None:
+        self.calls = {}  # {method: [count, total latency, max latency]}
+        self.lock = threading.Lock()
+
+    def add(self, method: str, latency: float) -> None:
+        with self.lock:
+            stats = self.calls.setdefault(method, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += latency
+            stats[2] = max(stats[2], latency)
+
+    def get_call_stats(self) -> dict[str, dict[str, float]]:
+        with self.lock:
+            return {
+                method: {'count': count, 'total': total, 'mean': total / count, 'max': max_latency}
+                for method, (count, total, max_latency) in self.calls.items()
+            }
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.calls = {}
+
+
+class RecordingExchange(CallStats):
+    """Wraps a ccxt exchange and appends every request, its response or error and its latency to a JSONL log.
+
+    Wrap the exchange returned by init_exchange before any rate limiter, so latencies exclude limiter waits.
+    market() is recorded once per symbol since it is served from the loaded markets.
+    """
+    def __init__(self, exchange, path: str, clock: Callable[[], float] = time.time) -> None:
+        super().__init__()
+        self.exchange = exchange
+        self.path = path
+        self.clock = clock
+        self.file = open_log(path, 'a')
+        self.write_lock = threading.Lock()
+        self.markets = set()
+        self.seq = 0
+
+    def write(self, record: dict) -> None:
+        with self.write_lock:
+            record['seq'] = self.seq
+            self.seq += 1
+            self.file.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+            self.file.flush()
+
+    def mark(self, label: str) -> None:
+        """Writes a marker, e.g. at the start of each trading cycle, to split the log into segments."""
+        self.write({'mark': label, 'ts': self.clock()})
+
+    def market(self, symbol: str) -> dict:
+        market = self.exchange.market(symbol)
+        if symbol not in self.markets:
+            self.markets.add(symbol)
+            self.write({'method': 'market', 'args': [symbol], 'kwargs': {}, 'result': market, 'ts': self.clock(), 'latency': 0.0})
+        return market
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.exchange, name)
+        if name not in recorded_methods:
+            return attr
+
+        def recorded_call(*args, **kwargs):
+            record = {'method': name, 'args': list(args), 'kwargs': kwargs, 'ts': self.clock()}
+            start = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+                record['result'] = result
+                return result
+            except Exception as e:
+                record['error'] = [type(e).__name__, str(e)]
+                raise
+            finally:
+                record['latency'] = time.perf_counter() - start
+                self.add(name, record['latency'])
+                self.write(record)
+        return recorded_call
+
+    def close(self) -> None:
+        with self.write_lock:
+            self.file.close()
+
+
+class ReplayingExchange(CallStats):
+    """Serves a RecordingExchange log back in place of the exchange, without network access.
+
+    Each call returns the next unused recorded response for the same method and arguments, falling
+    back to the next unused one of the same method, so concurrent callers get deterministic answers.
+    delay_factor scales the recorded latencies: 1.0 replays the original timing, 0.0 responds at once.
+    clock() returns the recorded time of the last served request or replayed mark(); pass it as `clock`
+    to the components whose requests depend on time, such as DataFetcher and TradeScheduler, and call
+    mark() at the same points as during recording.
+    """
+    def __init__(self, path: str, delay_factor: float = 0.0) -> None:
+        super().__init__()
+        self.delay_factor = delay_factor
+        self.records = []
+        self.markets = {}
+        self.marks = {}  # {label: deque of recorded times}
+        with open_log(path, 'r') as f:
+            for line in f:
+                record = json.loads(line)
+                if 'mark' in record:
+                    self.marks.setdefault(record['mark'], deque()).append(record['ts'])
+                    continue
+                if record['method'] == 'market':
+                    self.markets[record['args'][0]] = record['result']
+                else:
+                    self.records.append(record)
+
+        self.by_key = {}  # {call key: deque of record indices}
+        self.by_method = {}  # {method: deque of record indices}
+        for idx, record in enumerate(self.records):
+            self.by_key.setdefault(get_call_key(record['method'], record['args'], record['kwargs']), deque()).append(idx)
+            self.by_method.setdefault(record['method'], deque()).append(idx)
+
+        self.used = [False] * len(self.records)
+        self.now = self.records[0]['ts'] if self.records else time.time()
+        self.serve_lock = threading.Lock()
+
+    def clock(self) -> float:
+        return self.now
+
+    def mark(self, label: str) -> None:
+        """Moves the clock to the time at which the same marker was recorded."""
+        if self.marks.get(label):
+            self.now = self.marks[label].popleft()
+
+    def pop_unused(self, indices: deque | None) -> int | None:
+        while indices:
+            idx = indices.popleft()
+            if not self.used[idx]:
+                self.used[idx] = True
+                return idx
+        return None
+
+    def serve(self, method: str, args: tuple, kwargs: dict):
+        with self.serve_lock:
+            idx = self.pop_unused(self.by_key.get(get_call_key(method, args, kwargs)))
+            if idx is None:
+                idx = self.pop_unused(self.by_method.get(method))
+            if idx is None:
+                raise LookupError(f'No recorded response left for {method}')
+
+            record = self.records[idx]
+            self.now = max(self.now, record['ts'])
+
+        if self.delay_factor > 0:
+            time.sleep(record['latency'] * self.delay_factor)
+        self.add(method, record['latency'] * self.delay_factor)
+
+        if 'error' in record:
+            error_name, message = record['error']
+            raise getattr(ccxt, error_name, Exception)(message)
+        return record['result']
+
+    def remaining(self) -> int:
+        return self.used.count(False)
+
+    def market(self, symbol: str) -> dict:
+        return self.markets[symbol]
+
+    def __getattr__(self, name: str):
+        if name not in recorded_methods:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.serve(name, args, kwargs)
+
+
+def summarize_log(path: str) -> list[dict]:
+    """Returns call counts and latency per method for each segment between markers of a request log."""
+    segments = [{'mark': None, 'calls': {}}]
+    with open_log(path, 'r') as f:
+        for line in f:
+            record = json.loads(line)
+            if 'mark' in record:
+                segments.append({'mark': record['mark'], 'calls': {}})
+                continue
+            stats = segments[-1]['calls'].setdefault(record['method'], {'count': 0, 'total': 0.0, 'max': 0.0})
+            stats['count'] += 1
+            stats['total'] += record['latency']
+            stats['max'] = max(stats['max'], record['latency'])
+
+    return [segment for segment in segments if segment['calls'] or segment['mark'] is not None]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Summarize exchange calls per segment of a recorded request log.')
+    parser.add_argument('path', help='Request log written by RecordingExchange (.jsonl or .jsonl.gz)')
+    args = parser.parse_args()
+
+    for segment in summarize_log(args.path):
+        total_calls = sum(stats['count'] for stats in segment['calls'].values())
+        total_latency = sum(stats['total'] for stats in segment['calls'].values())
+        print(f"{segment['mark'] or '(start)'}: {total_calls} calls, {total_latency * 1000:.1f} ms")
+        for method, stats in sorted(segment['calls'].items()):
+            print(f"    {method:<28} {stats['count']:>5}  mean {stats['total'] / stats['count'] * 1000:8.1f} ms  max {stats['max'] * 1000:8.1f} ms")
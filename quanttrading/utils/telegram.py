@@ -1,14 +1,20 @@
 import requests
 
 from dotenv import load_dotenv
+from functools import lru_cache
 import os
+import queue
+import threading
+import time
 
 from quanttrading.utils import log
 
 
 logger = log.init_logger('Telegram')
 
-    
+MAX_MESSAGE_LEN = 4096  # Telegram's limit per message
+
+@lru_cache(maxsize=1)
 def _load_api_config() -> tuple[str, str]:
     load_dotenv()
     api_key = os.getenv("tg_api_key")
@@ -17,11 +23,144 @@ def _load_api_config() -> tuple[str, str]:
     return api_key, chat_id
 
 
-def send_message(message: str):
+class TelegramTransport:
+    """Posts messages to the Telegram bot API over one pooled HTTP session with timeouts."""
+    base_url = 'https://api.telegram.org/bot'
+    
+    def __init__(self, api_key: str | None = None, chat_id: str | None = None, timeout: float = 5.0) -> None:
+        if api_key is None or chat_id is None:
+            api_key, chat_id = _load_api_config()
+        self.api_key = api_key
+        self.chat_id = chat_id
+        self.timeout = timeout
+        self.session = requests.Session()
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key and self.chat_id)
+    
+    def send(self, message: str) -> None:
+        response = self.session.post(
+            f'{self.base_url}{self.api_key}/sendMessage',
+            data={'chat_id': self.chat_id, 'text': message},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+
+
+class StubTransport:
+    """Keeps sent messages in memory instead of calling Telegram, for tests and replays."""
+    enabled = True
+    
+    def __init__(self) -> None:
+        self.messages = []
+    
+    def send(self, message: str) -> None:
+        self.messages.append(message)
+
+
+class TelegramNotifier:
+    """Sends notifications from a background thread so callers only pay for an enqueue.
+    
+    Messages arriving within `batch_interval` seconds of each other are joined into one Telegram
+    message. When the bounded queue is full, overflow='drop' discards the new message and counts it,
+    overflow='block' waits up to `block_timeout` seconds for room before dropping it.
+    """
+    def __init__(
+        self,
+        transport: TelegramTransport | StubTransport | None = None,
+        max_queue: int = 1000,
+        batch_interval: float = 2.0,
+        overflow: str = 'drop',
+        block_timeout: float = 1.0,
+    ) -> None:
+        if overflow not in ('drop', 'block'):
+            raise ValueError(f'Invalid overflow policy: {overflow}')
+        
+        self.transport = transport or TelegramTransport()
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_interval = batch_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        
+        self.num_sent = 0
+        self.num_dropped = 0
+        self.num_failed = 0
+        
+        self.stop_event = threading.Event()
+        self.worker = threading.Thread(target=self.run, name='telegram', daemon=True)
+        self.worker.start()
+    
+    def notify(self, message: str) -> bool:
+        """Queues a message and returns False if it was dropped because the queue is full."""
+        try:
+            if self.overflow == 'block':
+                self.queue.put(message, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.num_dropped += 1
+            return False
+    
+    def collect_batch(self) -> list[str]:
+        """Waits for a message, then gathers everything else arriving within the batch interval."""
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        
+        deadline = time.monotonic() + self.batch_interval
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def run(self) -> None:
+        while not self.stop_event.is_set() or not self.queue.empty():
+            batch = self.collect_batch()
+            if batch:
+                self.send_batch(batch)
+    
+    def send_batch(self, batch: list[str]) -> None:
+        for message in split_message('\n'.join(batch)):
+            try:
+                self.transport.send(message)
+                self.num_sent += 1
+            except Exception as e:
+                self.num_failed += 1
+                logger.error(f'Failed to send Telegram message: {e}')
+        logger.debug('Sent %d notifications', len(batch))
+    
+    def close(self, timeout: float = 5.0) -> None:
+        """Sends what is still queued and stops the worker."""
+        self.stop_event.set()
+        self.worker.join(timeout)
+
+
+def split_message(text: str, max_len: int = MAX_MESSAGE_LEN) -> list[str]:
+    """Splits text into chunks within Telegram's message length, preferring line breaks."""
+    chunks = []
+    while len(text) > max_len:
+        cut = text.rfind('\n', 0, max_len)
+        cut = cut if cut > 0 else max_len
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip('\n')
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+_session = requests.Session()
+
+def send_message(message: str, timeout: float = 5.0):
+    """Sends a message synchronously. Prefer TelegramNotifier.notify on the trading path."""
     api_key, chat_id = _load_api_config()
     base_url = 'https://api.telegram.org/bot'
     
-    url = f'{base_url}{api_key}/sendMessage?chat_id={chat_id}&text={message}'
-    requests.get(url)
+    url = f'{base_url}{api_key}/sendMessage'
+    _session.get(url, params={'chat_id': chat_id, 'text': message}, timeout=timeout)
     
-    logger.debug(f'{message}')
+    logger.debug('%s', message)
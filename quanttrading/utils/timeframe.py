@@ -0,0 +1,33 @@
+import pandas as pd
+
+
+TIMEFRAME_SECONDS = {
+    '1m': 60,
+    '3m': 180,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '1h': 3600,
+    '4h': 14400,
+    '8h': 28800,
+    '1d': 86400,
+}
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    return TIMEFRAME_SECONDS[timeframe] * 1000
+
+
+def get_bar_open(timestamp_ms: int, timeframe: str) -> int:
+    """Returns the open time (ms) of the UTC-aligned bar containing the given timestamp."""
+    tf_ms = timeframe_to_ms(timeframe)
+    return int(timestamp_ms // tf_ms * tf_ms)
+
+
+def resample_klines(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Resamples klines to a higher timeframe with exchange-style UTC epoch-aligned, left-labelled bars."""
+    agg_funcs = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+    agg = {col: agg_funcs.get(col, 'last') for col in df.columns}
+    
+    resampled = df.resample(f'{TIMEFRAME_SECONDS[timeframe]}s', origin='epoch', label='left', closed='left').agg(agg)
+    return resampled.dropna(how='all')
@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+
+from quanttrading.data_fetcher import DataFetcher
+from quanttrading.strategies import BaseStrat
+from quanttrading.utils.log import init_logger
+
+
+logger = init_logger('warm_up')
+
+def warm_up_strategies(strats: list[BaseStrat], data_fetcher: DataFetcher, max_workers: int = 8, restore_snapshot: bool = False) -> dict[str, float]:
+    """Runs init_data for all strategies concurrently and returns each strategy's time-to-ready in seconds.
+    
+    Strategies should be created with auto_init=False so every window is registered before the first
+    fetch, letting the shared kline cache serve each (symbol, timeframe) with a single request.
+    """
+    start = time.perf_counter()
+    
+    if restore_snapshot:
+        data_fetcher.restore_snapshot()
+    
+    ready_times = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='warm_up') as executor:
+        futures = {executor.submit(strat.init_data): strat for strat in strats}
+        
+        for future in as_completed(futures):
+            strat = futures[future]
+            future.result()
+            ready_times[strat.strat_name] = time.perf_counter() - start
+            logger.info(f'{strat.id:03d} {strat.symbol} {strat.timeframe}, ready in {ready_times[strat.strat_name]:.2f}s')
+    
+    logger.info(f'Warmed up {len(strats)} strategies in {time.perf_counter() - start:.2f}s')
+    return ready_times
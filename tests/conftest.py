@@ -0,0 +1,147 @@
+import ccxt
+import numpy as np
+import pytest
+
+from quanttrading import DataFetcher, PositionEngine, StratPool, Trader
+from quanttrading.config_manager import StratConfig
+from quanttrading.netting import PortfolioNetting
+from quanttrading.position_book import PositionBook
+from quanttrading.strategies import BaseStrat
+from quanttrading.utils.timeframe import timeframe_to_ms
+
+
+NOW = 1_700_000_000.0  # A fixed start time so every run sees the same bars
+
+
+class FakeExchange:
+    """In-memory stand-in for the ccxt methods the bot calls, on a fixed random walk of 1m closes.
+
+    Orders fill immediately and in full. fetch_positions rejects more than one symbol, like Bybit.
+    """
+    rateLimit = 0
+
+    def __init__(self, now: float = NOW, num_bars: int = 2000, seed: int = 0) -> None:
+        self.now = now  # Seconds, advanced by the test
+        self.start_ms = int(now // 60 * 60 - num_bars * 60) * 1000
+        self.closes = 60000 + np.cumsum(np.random.default_rng(seed).normal(0, 10, num_bars + 1))
+        self.positions = {}  # {symbol: signed contracts}
+        self.orders = []
+        self.calls = {}
+
+    def count(self, method: str) -> None:
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+    def get_close(self, timestamp_ms: int) -> float:
+        idx = min(max((timestamp_ms - self.start_ms) // 60000, 0), len(self.closes) - 1)
+        return float(self.closes[idx])
+
+    def fetch_time(self) -> int:
+        return int(self.now * 1000)
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', since: int | None = None, limit: int | None = None, params: dict = {}) -> list:
+        self.count('fetch_ohlcv')
+        tf_ms = timeframe_to_ms(timeframe)
+        now_ms = int(self.now * 1000)
+        last_open = now_ms // tf_ms * tf_ms
+        limit = min(limit or 200, 1000)
+
+        first_open = last_open - (limit - 1) * tf_ms if since is None else -(-since // tf_ms) * tf_ms
+        bars = []
+        for open_ms in range(first_open, last_open + 1, tf_ms)[:limit]:
+            close = self.get_close(min(open_ms + tf_ms, now_ms) - 60000)
+            bars.append([open_ms, close, close, close, close, 1.0])
+        return bars
+
+    def fetch_funding_rate_history(self, symbol: str, since: int | None = None, limit: int | None = None, params: dict = {}) -> list:
+        self.count('fetch_funding_rate_history')
+        step = 8 * 3600 * 1000
+        last = int(self.now * 1000) // step * step
+        limit = min(limit or 200, 200)
+
+        first = last - (limit - 1) * step if since is None else -(-since // step) * step
+        return [{'timestamp': ts, 'fundingRate': ((ts // step) % 7 - 3) * 1e-4} for ts in range(first, last + 1, step)][:limit]
+
+    def get_position(self, symbol: str) -> dict:
+        contracts = self.positions.get(symbol, 0.0)
+        side = 'long' if contracts > 0 else 'short' if contracts < 0 else None
+        return {'symbol': symbol, 'side': side, 'contracts': abs(contracts)}
+
+    def fetch_position(self, symbol: str, params: dict = {}) -> dict:
+        self.count('fetch_position')
+        return self.get_position(symbol)
+
+    def fetch_positions(self, symbols: list[str] | None = None, params: dict = {}) -> list[dict]:
+        self.count('fetch_positions')
+        if symbols is not None and len(symbols) > 1:
+            raise ccxt.ArgumentsRequired('bybit fetchPositions() does not accept an array with more than one symbol')
+        return [self.get_position(symbol) for symbol in symbols or list(self.positions)]
+
+    def market(self, symbol: str) -> dict:
+        return {'symbol': symbol, 'settle': 'USDT', 'precision': {'amount': 0.001}}
+
+    def fetch_order_book(self, symbol: str, limit: int | None = None, params: dict = {}) -> dict:
+        self.count('fetch_order_book')
+        close = self.get_close(int(self.now * 1000) - 60000)
+        return {'bids': [[close - 0.5, 1.0]], 'asks': [[close + 0.5, 1.0]]}
+
+    def create_order(self, symbol: str, type: str, side: str, amount: float, price: float | None = None, params: dict = {}) -> dict:
+        self.count('create_order')
+        self.positions[symbol] = self.positions.get(symbol, 0.0) + (amount if side == 'buy' else -amount)
+        order = {'id': str(len(self.orders) + 1), 'symbol': symbol, 'type': type, 'side': side, 'amount': amount, 'filled': amount, 'status': 'closed'}
+        self.orders.append(order)
+        return order
+
+
+class ConstantStrat(BaseStrat):
+    """Emits its 'signal' param on every bar, so a test sets each strategy's signal exactly."""
+    def fetch_alpha(self):
+        return self.data_fetcher.fetch_cached_prices(self.symbol, self.timeframe, limit=self.max_window)
+
+    def calculate_signal_df(self, df, window, signal):
+        df['signal'] = float(signal)
+        return df
+
+
+@pytest.fixture
+def exchange() -> FakeExchange:
+    return FakeExchange()
+
+
+@pytest.fixture
+def make_trader(tmp_path):
+    """Returns a factory building the live pipeline on a new FakeExchange.
+
+    Each strategy is given as (symbol, timeframe, side, signal, max_pos) and warmed up on creation.
+    """
+    runs = iter(range(1_000_000))
+
+    def make(strat_specs: list[tuple[str, str, str, float, float]], netting: bool = False, symbol_caps: dict[str, float] | None = None,
+             enforce_side: bool = False, max_workers: int = 1, reconcile_interval: float = 0.0) -> tuple[FakeExchange, Trader]:
+        exchange = FakeExchange()
+        data_fetcher = DataFetcher(exchange, str(tmp_path / f'run_{next(runs)}'), store_type='columnar', clock=lambda: exchange.now,
+                                   incremental=True, rate_limit=1_000_000)
+
+        strat_pool = StratPool()
+        for i, (symbol, timeframe, side, signal, max_pos) in enumerate(strat_specs, start=1):
+            config = StratConfig(id=i, name=f'const_{i}', type='test', symbol=symbol, timeframe=timeframe, side=side, max_pos=max_pos,
+                                 params=[{'window': 5, 'signal': signal}], order_type='market', mdd_limit=1.0)
+            strat_pool.add_strategies([ConstantStrat(config, data_fetcher)])
+
+        portfolio_netting = PortfolioNetting(strat_pool, data_fetcher, symbol_caps, enforce_side) if netting else None
+        position_engine = PositionEngine(exchange, strat_pool, data_fetcher, PositionBook(exchange, reconcile_interval, clock=lambda: exchange.now),
+                                         netting=portfolio_netting, symbol_caps=symbol_caps, enforce_side=enforce_side)
+        return exchange, Trader(exchange, position_engine, strat_pool, max_workers=max_workers)
+
+    return make
+
+
+@pytest.fixture
+def run_cycle():
+    """Returns a function advancing to the next 1m bar and running one cycle with `timeframe` closing; it returns the positions."""
+    def run(exchange: FakeExchange, trader: Trader, timeframe: str = '1m') -> dict[str, float]:
+        exchange.now += 60
+        trader.activate_timeframe(timeframe)
+        trader.trade()
+        return exchange.positions
+
+    return run
@@ -0,0 +1,35 @@
+from quanttrading import DataFetcher
+from quanttrading.utils.rate_limit import RateLimiter, RateLimitedExchange
+
+
+class CountingLimiter(RateLimiter):
+    def __init__(self) -> None:
+        super().__init__(max_calls=1_000_000)
+        self.acquired = 0
+
+    def acquire(self) -> None:
+        self.acquired += 1
+        super().acquire()
+
+
+def test_rate_limited_exchange_is_not_limited_twice(exchange, tmp_path):
+    rate_limiter = CountingLimiter()
+    data_fetcher = DataFetcher(RateLimitedExchange(exchange, rate_limiter), str(tmp_path), clock=lambda: exchange.now)
+
+    data_fetcher.fetch_historical_prices('SYM00USDT', '1m', limit=10)
+    data_fetcher.fetch_funding_rate_history('SYM00USDT', limit=10)
+
+    assert data_fetcher.rate_limiter is None
+    assert rate_limiter.acquired == 2
+
+
+def test_incremental_funding_buffer_is_trimmed_to_limit(exchange, tmp_path):
+    data_fetcher = DataFetcher(exchange, str(tmp_path), clock=lambda: exchange.now, incremental=True)
+    data_fetcher.fetch_cached_funding_rates('SYM00USDT', limit=30)
+
+    exchange.now += 8 * 3600
+    df = data_fetcher.fetch_cached_funding_rates('SYM00USDT', limit=20)
+
+    assert exchange.calls['fetch_funding_rate_history'] == 2
+    assert len(df) == len(data_fetcher.funding_rates['SYM00USDT']) == 20
+    assert df.index[-1].timestamp() == exchange.now // (8 * 3600) * (8 * 3600)
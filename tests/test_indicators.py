@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from quanttrading.indicators import (IndicatorCache, RollingStats, StreamingRollingStats, rolling_mean_matrix, rolling_moment_sums,
+                                     rolling_std_matrix)
+
+
+WINDOWS = [1, 2, 5, 20, 20, 64]
+
+
+def make_closes(num_rows: int, nan_rows: list[int] = (), seed: int = 0) -> np.ndarray:
+    """A random walk around 60000, where rounding error would show, with NaNs at the given rows."""
+    values = 60000 + np.random.default_rng(seed).normal(0, 10, num_rows).cumsum()
+    values[list(nan_rows)] = np.nan
+    return values
+
+
+@pytest.mark.parametrize('nan_rows', [[], [0], [3, 100, 101, 130], list(range(200, 300))])
+def test_rolling_moment_sums_match_pandas_across_blocks(nan_rows):
+    values = make_closes(500, nan_rows)
+    windows = np.array(sorted(set(WINDOWS)))
+    sums, sq_sums, offsets = rolling_moment_sums(values, windows, block_size=64)
+
+    # Each row's sums are of the values in its window minus the offset of the row's block
+    for col, window in enumerate(windows):
+        expected_sums = np.full(len(values), np.nan)
+        expected_sq_sums = expected_sums.copy()
+        for row in range(window - 1, len(values)):
+            centered = values[row - window + 1:row + 1] - offsets[row]
+            expected_sums[row], expected_sq_sums[row] = centered.sum(), (centered ** 2).sum()
+
+        np.testing.assert_allclose(sums[:, col], expected_sums, rtol=1e-9, atol=1e-6)
+        np.testing.assert_allclose(sq_sums[:, col], expected_sq_sums, rtol=1e-9, atol=1e-6)
+        np.testing.assert_array_equal(np.isnan(sums[:, col]), pd.Series(values).rolling(window).sum().isna())
+
+
+@pytest.mark.parametrize('nan_rows', [[], [0, 1], [50, 4500, 4501], list(range(5000, 5100))])
+def test_rolling_matrices_match_pandas(nan_rows):
+    values = make_closes(10_000, nan_rows)
+    means = rolling_mean_matrix(values, np.array(WINDOWS))
+    stds = rolling_std_matrix(values, np.array(WINDOWS))
+
+    for col, window in enumerate(WINDOWS):
+        rolling = pd.Series(values).rolling(window)
+        np.testing.assert_allclose(means[:, col], rolling.mean(), rtol=1e-12)
+        # The variance is a difference of block prefix sums, exact to about 1e-6 at this price scale
+        np.testing.assert_allclose(stds[:, col], rolling.std(), rtol=1e-6, atol=1e-3)
+        np.testing.assert_array_equal(np.isnan(stds[:, col]), rolling.std().isna())
+
+
+@pytest.mark.parametrize('nan_rows', [[], [0], [10, 11, 40], list(range(100, 130))])
+def test_rolling_stats_match_pandas(nan_rows):
+    values = make_closes(300, nan_rows)
+    stats = RollingStats(20, resync_every=97)
+    means, stds = [], []
+    for value in values:
+        stats.update(value)
+        means.append(stats.mean)
+        stds.append(stats.std)
+
+    rolling = pd.Series(values).rolling(20)
+    np.testing.assert_allclose(means, rolling.mean(), rtol=1e-12)
+    np.testing.assert_allclose(stds, rolling.std(), rtol=1e-6)
+
+
+def test_streaming_rolling_stats_match_pandas_with_revised_bars():
+    closes = pd.Series(make_closes(400, [50, 51, 300]), index=pd.date_range('2024-01-01', periods=400, freq='1min'))
+    streaming = StreamingRollingStats(20)
+
+    # Every call passes the last 200 bars up to a new bar, and the previous bar is revised on the way
+    for end in range(200, 401, 7):
+        window = closes.iloc[end - 200:end].copy()
+        window.iloc[-2] += 1.0
+        closes.iloc[end - 2] = window.iloc[-2]
+        mean, std = streaming.update(window)
+
+        rolling = closes.iloc[:end].rolling(20)
+        np.testing.assert_allclose(mean.iloc[20:], rolling.mean().iloc[end - 180:end], rtol=1e-12)
+        np.testing.assert_allclose(std.iloc[20:], rolling.std().iloc[end - 180:end], rtol=1e-6)
+
+
+def make_series(num_rows: int, start: str = '2024-01-01', last_close: float | None = None) -> pd.Series:
+    values = make_closes(num_rows)
+    if last_close is not None:
+        values[-1] = last_close
+    return pd.Series(values, index=pd.date_range(start, periods=num_rows, freq='1min'))
+
+
+def test_indicator_cache_hits_within_a_bar():
+    cache = IndicatorCache()
+    values = make_series(100)
+    computed = cache.get('BTCUSDT', '1m', 'mean', 10, values, lambda: values.rolling(10).mean().to_numpy())
+
+    assert cache.get('BTCUSDT', '1m', 'mean', 10, values, lambda: pytest.fail('recomputed')) is computed
+    assert not computed.flags.writeable
+    assert cache.get_stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+
+def test_indicator_cache_is_invalidated_by_a_new_or_revised_bar():
+    cache = IndicatorCache()
+    values = make_series(100)
+    cache.get('BTCUSDT', '1m', 'mean', 10, values, lambda: values.rolling(10).mean().to_numpy())
+    cache.get('ETHUSDT', '1m', 'mean', 10, values, lambda: values.rolling(10).mean().to_numpy())
+
+    revised = make_series(100, last_close=1.0)
+    assert cache.lookup('BTCUSDT', '1m', 'mean', [10], revised) == {}
+
+    # A new bar of one symbol leaves the other symbol's entries alone
+    assert 10 in cache.lookup('ETHUSDT', '1m', 'mean', [10], values)
+    assert cache.lookup('BTCUSDT', '1m', 'mean', [10], make_series(101)) == {}
+
+
+def test_indicator_cache_partial_hit_masks_warm_up_rows():
+    cache = IndicatorCache()
+    values = make_series(100)
+    full = cache.get('BTCUSDT', '1m', 'mean', 10, values, lambda: values.rolling(10).mean().to_numpy())
+
+    tail = values.iloc[40:]
+    found = cache.lookup('BTCUSDT', '1m', 'mean', [10, 20], tail)
+
+    # The first 9 rows would have been warm-up NaNs had the caller computed them from its own bars
+    assert list(found) == [10]
+    np.testing.assert_allclose(found[10], tail.rolling(10).mean().to_numpy(), rtol=1e-12)
+    assert np.isnan(found[10][:9]).all() and not np.isnan(full[40:49]).any()
+
+    # Bars that are not a contiguous part of the cached ones miss
+    assert cache.lookup('BTCUSDT', '1m', 'mean', [10], pd.concat([values.iloc[:50], values.iloc[51:]])) == {}
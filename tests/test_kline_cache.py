@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from quanttrading.kline_cache import KlineCache
+
+
+START = 1_700_000_000.0
+
+
+class BarSource:
+    """Serves 1m bars up to the clock, where the bar still forming has a close that changes with the clock."""
+    def __init__(self) -> None:
+        self.now = START
+        self.calls = []  # [(since, limit)]
+        self.missing = set()  # Bar opens left out of the next response, like an exchange dropping bars
+
+    def get_close(self, open_ms: int) -> float:
+        now_ms = int(self.now * 1000)
+        return open_ms / 60000 + min(now_ms - open_ms, 60000) / 1e6
+
+    def fetch(self, symbol: str, timeframe: str, since: int | None, limit: int | None) -> pd.DataFrame:
+        self.calls.append((since, limit))
+        last_open = int(self.now * 1000) // 60000 * 60000
+        first_open = last_open - (limit - 1) * 60000 if since is None else since
+        opens = [open_ms for open_ms in range(first_open, first_open + limit * 60000, 60000)
+                 if open_ms <= last_open and open_ms not in self.missing]
+        self.missing = set()
+        return pd.DataFrame({'close': [self.get_close(open_ms) for open_ms in opens]}, index=pd.to_datetime(opens, unit='ms'))
+
+    def expected(self, limit: int) -> pd.DataFrame:
+        """The last `limit` bars as a full fetch would return them now."""
+        return self.fetch('BTCUSDT', '1m', None, limit)
+
+
+@pytest.fixture
+def source() -> BarSource:
+    return BarSource()
+
+
+def test_one_fetch_per_bar_for_the_longest_registered_window(source):
+    cache = KlineCache(source.fetch, lambda: source.now)
+    cache.register('BTCUSDT', '1m', 50)
+
+    df = cache.get('BTCUSDT', '1m', 20)
+    source.now += 30  # Same bar
+    assert cache.get('BTCUSDT', '1m', 50).iloc[-20:].equals(df)
+
+    assert source.calls == [(None, 50)]
+    assert len(df) == 20
+    assert cache.get_stats()['hits'] == 1
+
+
+def test_incremental_merge_revises_the_last_bar_and_appends_new_ones(source):
+    cache = KlineCache(source.fetch, lambda: source.now, incremental=True)
+    first = cache.get('BTCUSDT', '1m', 50)
+
+    source.now += 3 * 60
+    df = cache.get('BTCUSDT', '1m', 50)
+
+    # Only the last buffered bar and the 3 new ones are fetched, starting at the last buffered bar
+    assert source.calls[1] == (int(first.index[-1].value // 10**6), 4)
+    assert df.index[-4] == first.index[-1] and df.iloc[-4]['close'] != first.iloc[-1]['close']
+    pd.testing.assert_frame_equal(df, source.expected(50))
+
+
+def test_incremental_merge_backfills_missing_bars(source):
+    cache = KlineCache(source.fetch, lambda: source.now, incremental=True)
+    cache.get('BTCUSDT', '1m', 50)
+
+    source.now += 5 * 60
+    last_open = int(source.now * 1000) // 60000 * 60000
+    source.missing = {last_open - 3 * 60000, last_open - 2 * 60000}
+    df = cache.get('BTCUSDT', '1m', 50)
+
+    assert source.calls[-1] == (last_open - 3 * 60000, 2)
+    pd.testing.assert_frame_equal(df, source.expected(50))
+
+
+def test_incremental_refetches_the_window_when_too_far_behind(source):
+    cache = KlineCache(source.fetch, lambda: source.now, incremental=True)
+    cache.get('BTCUSDT', '1m', 50)
+
+    source.now += 60 * 60
+    df = cache.get('BTCUSDT', '1m', 50)
+
+    assert source.calls[-1] == (None, 50)
+    pd.testing.assert_frame_equal(df, source.expected(50))
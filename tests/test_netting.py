@@ -0,0 +1,50 @@
+import pytest
+
+
+# SYM00 and SYM01 each get a long, a short and a long_short strategy on 1m, 5m and 15m
+STRATS = [
+    ('SYM00USDT', '1m', 'long', 1.0, 0.1),
+    ('SYM01USDT', '1m', 'long', -0.5, 0.1),
+    ('SYM00USDT', '5m', 'short', -1.0, 0.1),
+    ('SYM01USDT', '5m', 'short', 0.8, 0.1),
+    ('SYM00USDT', '15m', 'long_short', 0.6, 0.1),
+    ('SYM01USDT', '15m', 'long_short', -0.9, 0.1),
+]
+
+
+@pytest.mark.parametrize('netting', [False, True])
+def test_signals_against_their_side_are_traded_by_default(make_trader, run_cycle, netting):
+    # Like Strat001 in config/strategies.yaml, which is 'long' but only emits -1 or 0
+    exchange, trader = make_trader([('SYM00USDT', '1m', 'long', -1.0, 0.12)], netting=netting)
+
+    assert run_cycle(exchange, trader)['SYM00USDT'] == pytest.approx(-0.12)
+
+
+@pytest.mark.parametrize('netting', [False, True])
+def test_signals_are_clipped_to_side_when_enforced(make_trader, run_cycle, netting):
+    exchange, trader = make_trader(STRATS, netting=netting, enforce_side=True)
+    positions = run_cycle(exchange, trader)
+
+    # SYM00: long 1.0 -> 0.1, short -1.0 -> -0.1, long_short 0.6 -> 0.06
+    # SYM01: long -0.5 -> 0, short 0.8 -> 0, long_short -0.9 -> -0.09
+    assert positions['SYM00USDT'] == pytest.approx(0.06)
+    assert positions['SYM01USDT'] == pytest.approx(-0.09)
+
+
+@pytest.mark.parametrize('netting', [False, True])
+def test_symbol_cap(make_trader, run_cycle, netting):
+    exchange, trader = make_trader(STRATS, netting=netting, symbol_caps={'SYM01USDT': 0.05})
+    positions = run_cycle(exchange, trader)
+
+    # Unclipped, SYM01 nets -0.05 + 0.08 - 0.09 = -0.06, capped at -0.05
+    assert positions['SYM00USDT'] == pytest.approx(0.06)
+    assert positions['SYM01USDT'] == pytest.approx(-0.05)
+
+
+@pytest.mark.parametrize('enforce_side', [False, True])
+def test_netting_matches_per_strategy_targets(make_trader, run_cycle, enforce_side):
+    symbol_caps = {'SYM00USDT': 0.03}
+    loop_exchange, loop_trader = make_trader(STRATS, symbol_caps=symbol_caps, enforce_side=enforce_side)
+    netting_exchange, netting_trader = make_trader(STRATS, netting=True, symbol_caps=symbol_caps, enforce_side=enforce_side)
+
+    assert run_cycle(loop_exchange, loop_trader) == pytest.approx(run_cycle(netting_exchange, netting_trader))
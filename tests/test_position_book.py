@@ -0,0 +1,19 @@
+from quanttrading.position_book import PositionBook
+
+
+def test_refresh_many_symbols_with_bybit_fetch_positions_rule(exchange):
+    exchange.positions = {'BTCUSDT': 0.5, 'ETHUSDT': -2.0, 'SOLUSDT': 3.0}
+    book = PositionBook(exchange)
+
+    book.refresh(['BTCUSDT', 'ETHUSDT', 'XRPUSDT'])
+
+    # Positions of symbols outside the book are ignored, symbols without a position are flat
+    assert book.positions == {'BTCUSDT': 0.5, 'ETHUSDT': -2.0, 'XRPUSDT': 0.0}
+
+
+def test_get_position_of_a_new_symbol(exchange):
+    exchange.positions = {'BTCUSDT': -1.5}
+    book = PositionBook(exchange)
+
+    assert book.get_position('BTCUSDT') == -1.5
+    assert exchange.calls['fetch_positions'] == 1
@@ -0,0 +1,37 @@
+import pytest
+
+from quanttrading.config_manager import StratConfig
+from quanttrading.pipeline import Pipeline
+from quanttrading.replay import replay_request_log
+from quanttrading.utils.recorder import RecordingExchange, summarize_log
+from tests.conftest import ConstantStrat
+
+
+def test_recorded_cycles_replay_to_the_same_requests_and_positions(exchange, run_cycle, tmp_path):
+    config = StratConfig(id=1, name='const', type='test', symbol='SYM00USDT', timeframe='1m', side='long', max_pos=0.1,
+                         params=[{'window': 5, 'signal': 1.0}], order_type='market', mdd_limit=1.0)
+    path = str(tmp_path / 'requests.jsonl.gz')
+
+    recorder = RecordingExchange(exchange, path, clock=lambda: exchange.now)
+    pipeline = Pipeline(recorder, [config], str(tmp_path / 'live'), clock=lambda: exchange.now, strat_classes={1: ConstantStrat},
+                        max_workers=1, rate_limit=1_000_000)
+    for _ in range(3):
+        run_cycle(exchange, pipeline.trader)
+    recorder.close()
+
+    segments = summarize_log(path)
+    assert [segment['mark'] for segment in segments[1:]] == ['cycle 1m'] * 3
+
+    replay = replay_request_log(path, [config], str(tmp_path / 'replay'), strat_classes={1: ConstantStrat})
+
+    assert replay['cycles'] == 3
+    assert replay['unused_responses'] == 0
+
+    # market() is answered from the loaded markets, so it is recorded once but not served as a call
+    cycle_calls = {}
+    for segment in segments[1:]:
+        for method, stats in segment['calls'].items():
+            if method != 'market':
+                cycle_calls[method] = cycle_calls.get(method, 0) + stats['count']
+    assert {method: stats['count'] for method, stats in replay['calls'].items()} == cycle_calls
+    assert replay['positions'] == pytest.approx(exchange.positions) == {'SYM00USDT': pytest.approx(0.1)}
@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+
+from quanttrading.config_manager import StratConfig
+from quanttrading.replay import Replay, ReplayExchange, SimClock
+from tests.conftest import ConstantStrat
+
+
+def test_replay_trades_through_the_live_netting_path(tmp_path):
+    index = pd.date_range('2024-06-01', periods=24 * 60, freq='1min', name='timestamp')
+    klines = {'BTCUSDT': pd.DataFrame({'close': 60000.0}, index=index)}
+    clock = SimClock(pd.Timestamp('2024-06-01 12:00', tz='UTC').timestamp())
+    config = StratConfig(id=1, name='const', type='test', symbol='BTCUSDT', timeframe='5m', side='long', max_pos=0.2,
+                         params=[{'window': 5, 'signal': -1.0}], order_type='market', mdd_limit=1.0)
+
+    replay = Replay([(ConstantStrat, config)], ReplayExchange(klines, clock), clock, folder=str(tmp_path))
+    stats = replay.run(clock() + 3600)
+
+    assert replay.position_engine.netting is not None
+    assert stats['cycles'] == 12
+    assert replay.exchange.positions == {'BTCUSDT': pytest.approx(-0.2)}
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from quanttrading.signal_store import init_signal_store, migrate_csv_signals
+
+
+def make_signals(start: str, num_rows: int, seed: int = 0) -> pd.DataFrame:
+    index = pd.date_range(start, periods=num_rows, freq='1min', name='timestamp')
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'close': 60000 + rng.normal(0, 10, num_rows).cumsum(), 'signal': rng.integers(-1, 2, num_rows).astype(float)}, index=index)
+
+
+@pytest.mark.parametrize('store_type', ['csv', 'columnar'])
+def test_write_upserts_the_last_bar_and_appends(store_type, tmp_path):
+    store = init_signal_store(store_type, str(tmp_path))
+    df = make_signals('2024-01-01', 5)
+    store.write(df, 'strat')
+
+    # The next cycle revises the last bar and adds a new one
+    update = make_signals('2024-01-01 00:04', 2, seed=1)
+    store.write(update, 'strat')
+
+    expected = pd.concat([df.iloc[:-1], update])
+    pd.testing.assert_frame_equal(store.read('strat'), expected, check_freq=False, check_names=False)
+    pd.testing.assert_series_equal(store.read_last('strat'), expected.iloc[-1], check_names=False)
+    assert store.read_last('strat').name == expected.index[-1]
+
+
+def test_columnar_write_leaves_stored_history_untouched(tmp_path):
+    store = init_signal_store('columnar', str(tmp_path))
+    df = make_signals('2024-01-01', 5)
+    store.write(df, 'strat')
+
+    # Rows before the last stored bar are history and are not rewritten
+    store.write(make_signals('2024-01-01 00:02', 4, seed=1), 'strat')
+
+    stored = store.read('strat')
+    pd.testing.assert_frame_equal(stored.iloc[:4], df.iloc[:4], check_freq=False)
+    assert len(stored) == 6
+
+
+def test_columnar_new_column_is_backfilled_with_nan(tmp_path):
+    store = init_signal_store('columnar', str(tmp_path))
+    store.write(make_signals('2024-01-01', 5), 'strat')
+
+    update = make_signals('2024-01-01 00:04', 2, seed=1).assign(signal_2=[0.5, 1.0])
+    store.write(update, 'strat')
+
+    stored = store.read('strat')
+    assert list(stored.columns) == ['close', 'signal', 'signal_2']
+    assert stored['signal_2'].isna().sum() == 4
+    assert store.read_last('strat')['signal_2'] == 1.0
+
+    # A column missing from a later write is stored as NaN
+    store.write(make_signals('2024-01-01 00:06', 1, seed=2), 'strat')
+    assert np.isnan(store.read_last('strat')['signal_2'])
+
+
+@pytest.mark.parametrize('store_type', ['csv', 'columnar'])
+def test_read_last_of_an_empty_table_raises(store_type, tmp_path):
+    store = init_signal_store(store_type, str(tmp_path))
+    store.write(make_signals('2024-01-01', 0), 'strat')
+
+    with pytest.raises(ValueError):
+        store.read_last('strat')
+
+
+def test_migrate_csv_signals_skips_empty_and_existing_tables(tmp_path):
+    csv_store = init_signal_store('csv', str(tmp_path))
+    csv_store.write(make_signals('2024-01-01', 5), 'strat_a')
+    csv_store.write(make_signals('2024-01-01', 3, seed=1), 'strat_b')
+    csv_store.write(make_signals('2024-01-01', 0), 'strat_empty')
+
+    store = init_signal_store('columnar', str(tmp_path))
+    store.write(make_signals('2024-01-01', 2, seed=2), 'strat_b')
+
+    assert migrate_csv_signals(str(tmp_path), store) == ['strat_a']
+    pd.testing.assert_frame_equal(store.read('strat_a'), csv_store.read('strat_a'), check_freq=False, check_names=False)
+    assert not store.exists('strat_empty')
@@ -0,0 +1,21 @@
+import pytest
+
+from quanttrading.config_manager import StratConfig
+from quanttrading.pipeline import Pipeline
+from tests.conftest import ConstantStrat
+
+
+def test_synced_clock_offset_is_shared_with_the_pipeline(exchange, tmp_path):
+    config = StratConfig(id=1, name='const', type='test', symbol='SYM00USDT', timeframe='1m', side='long', max_pos=0.1,
+                         params=[{'window': 5, 'signal': 1.0}], order_type='market', mdd_limit=1.0)
+    local_clock = lambda: exchange.now - 2.5  # The local clock lags the exchange
+    pipeline = Pipeline(exchange, [config], str(tmp_path), clock=local_clock, strat_classes={1: ConstantStrat},
+                        max_workers=1, rate_limit=1_000_000)
+
+    pipeline.trade_scheduler.sync_clock_offset(exchange)
+
+    assert pipeline.trade_scheduler.clock_offset == pytest.approx(2.5)
+    assert pipeline.trade_scheduler.get_exchange_time() == pytest.approx(exchange.now)
+    assert pipeline.data_fetcher.clock() == pytest.approx(exchange.now)
+    assert pipeline.data_fetcher.kline_cache.clock() == pytest.approx(exchange.now)
+    assert pipeline.position_book.clock() == pytest.approx(exchange.now)
@@ -0,0 +1,47 @@
+import pytest
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_symbol_with_failed_signal_update_is_not_traded(make_trader, run_cycle, max_workers):
+    exchange, trader = make_trader([('SYM00USDT', '1m', 'long', 1.0, 0.1), ('SYM01USDT', '1m', 'long', 1.0, 0.1)],
+                                   netting=True, max_workers=max_workers)
+    position_engine = trader.position_engine
+
+    update_signals = position_engine.update_signals
+    def failing_update_signals(symbol, active_tfs, inactive_tfs):
+        if symbol == 'SYM01USDT':
+            raise RuntimeError('no klines')
+        update_signals(symbol, active_tfs, inactive_tfs)
+    position_engine.update_signals = failing_update_signals
+
+    positions = run_cycle(exchange, trader)
+
+    assert positions == {'SYM00USDT': pytest.approx(0.1)}
+
+
+def test_failed_cycle_deactivates_timeframes(make_trader, run_cycle):
+    exchange, trader = make_trader([('SYM00USDT', '1m', 'long', 1.0, 0.1)])
+    def failing_refresh_positions(symbols):
+        raise RuntimeError('exchange down')
+    trader.position_engine.refresh_positions = failing_refresh_positions
+
+    with pytest.raises(RuntimeError):
+        run_cycle(exchange, trader)
+
+    assert trader.get_active_timeframes() == []
+
+
+def test_unfilled_limit_order_is_reconciled_before_the_next_trade(make_trader, run_cycle):
+    exchange, trader = make_trader([('SYM00USDT', '1m', 'long', 1.0, 0.1)], reconcile_interval=3600)
+    orders = []
+    def create_resting_order(symbol, type, side, amount, price=None, params={}):
+        orders.append((symbol, type, side, amount))
+        return {'id': str(len(orders)), 'symbol': symbol, 'filled': 0.0, 'status': 'open'}
+    exchange.create_order = create_resting_order
+
+    run_cycle(exchange, trader)
+    exchange.positions['SYM00USDT'] = 0.1  # The limit order fills after the cycle
+    run_cycle(exchange, trader)
+
+    assert orders == [('SYM00USDT', 'limit', 'buy', 0.1)]
+    assert trader.position_engine.position_book.positions == {'SYM00USDT': 0.1}
@@ -1,3 +1,22 @@
-from .strat_001 import Strat001
-from .strat_002 import Strat002
-from .strat_003 import Strat003
\ No newline at end of file
+import importlib
+
+
+# Strategy class -> module, imported on first attribute access (PEP 562) so only configured strategies are loaded
+strategy_modules = {
+    'Strat001': '.strat_001',
+    'Strat002': '.strat_002',
+    'Strat003': '.strat_003',
+}
+
+__all__ = list(strategy_modules)
+
+def __getattr__(name: str):
+    if name not in strategy_modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    strat_cls = getattr(importlib.import_module(strategy_modules[name], __name__), name)
+    globals()[name] = strat_cls
+    return strat_cls
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
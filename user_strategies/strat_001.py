@@ -4,9 +4,15 @@ from quanttrading import BaseStrat
 
 
 class Strat001(BaseStrat):
+    vectorized = True
+    
     def fetch_alpha(self) -> pd.DataFrame:
-        return self.data_fetcher.fetch_funding_rate_history(self.symbol, limit=self.max_window)
+        return self.data_fetcher.fetch_cached_funding_rates(self.symbol, limit=self.max_window)
     
     def calculate_signal_df(self, df: pd.DataFrame, window, threshold) -> pd.DataFrame:
         df['signal'] = np.where(df['funding_rate'] < threshold, -1, 0)
-        return df
\ No newline at end of file
+        return df
+    
+    def calculate_signal_matrix(self, df: pd.DataFrame, window: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+        funding_rate = df['funding_rate'].to_numpy(dtype=np.float64)
+        return np.where(funding_rate[:, None] < threshold, -1, 0)
\ No newline at end of file
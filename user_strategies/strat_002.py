@@ -4,10 +4,20 @@ from quanttrading import BaseStrat
 
 
 class Strat002(BaseStrat):
+    vectorized = True
+    
     def fetch_alpha(self) -> pd.DataFrame:
-        return self.data_fetcher.fetch_historical_prices(self.symbol, self.timeframe, limit=self.max_window)
+        return self.data_fetcher.fetch_cached_prices(self.symbol, self.timeframe, limit=self.max_window)
     
     def calculate_signal_df(self, df: pd.DataFrame, window, threshold) -> pd.DataFrame:
         df = self.calculate_z_score(df, window)
         df['signal'] = np.where(df['z'] > threshold, 1, 0)
-        return df
\ No newline at end of file
+        return df
+    
+    def calculate_signal_matrix(self, df: pd.DataFrame, window: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+        close = df['close'].to_numpy(dtype=np.float64)
+        ma = self.get_indicator_matrix(df, 'ma', window)
+        std = self.get_indicator_matrix(df, 'std', window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (close[:, None] - ma) / std
+        return np.where(z > threshold, 1, 0)
\ No newline at end of file
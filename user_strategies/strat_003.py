@@ -4,10 +4,17 @@ from quanttrading import BaseStrat
 
 
 class Strat003(BaseStrat):
+    vectorized = True
+    
     def fetch_alpha(self) -> pd.DataFrame:
-        return self.data_fetcher.fetch_historical_prices(self.symbol, self.timeframe, limit=self.max_window)
+        return self.data_fetcher.fetch_cached_prices(self.symbol, self.timeframe, limit=self.max_window)
     
     def calculate_signal_df(self, df: pd.DataFrame, window, threshold) -> pd.DataFrame:
         df = self.calculate_ma_pct_diff(df, window)
         df['signal'] = np.where(df['pct_diff'] > threshold, 1, 0)
-        return df
\ No newline at end of file
+        return df
+    
+    def calculate_signal_matrix(self, df: pd.DataFrame, window: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+        close = df['close'].to_numpy(dtype=np.float64)
+        pct_diff = close[:, None] / self.get_indicator_matrix(df, 'ma', window) - 1
+        return np.where(pct_diff > threshold, 1, 0)
\ No newline at end of file